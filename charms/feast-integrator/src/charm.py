@@ -11,15 +11,27 @@ It then creates the feature store configuration file with the databases connecti
 
 import logging
 from pathlib import Path
+from typing import Dict, List
 
 import ops
-from charmed_kubeflow_chisme.components.charm_reconciler import CharmReconciler
 from charmed_kubeflow_chisme.components.leadership_gate_component import (
     LeadershipGateComponent,
 )
 
-from components.database_requirer_component import PostgresRequirerComponent
+from components.connection_budget_component import (
+    ConnectionBudgetComponent,
+    ConnectionBudgetInputs,
+)
+from components.database_requirer_component import (
+    PostgresRequirerComponent,
+    PostgresRequirerInputs,
+)
+from components.entity_select_mode_component import (
+    EntitySelectModeComponent,
+    EntitySelectModeInputs,
+)
 from components.poddefault_sender_component import PodDefaultSenderComponent
+from components.pooled_stores_component import PooledStoresComponent, PooledStoresInputs
 from components.secret_sender_component import (
     FeastSecretSenderComponent,
     FeastSecretSenderInputs,
@@ -28,12 +40,19 @@ from components.store_configuration_sender_component import (
     StoreConfigurationSenderComponent,
     StoreConfigurationSenderInputs,
 )
+from instrumented_charm_reconciler import InstrumentedCharmReconciler
+from online_store_tables import OnlineStoreTablesError, OnlineTableLayout, provision_online_tables
+from store_benchmark import StoreBenchmarkError, benchmark_store
 
 logger = logging.getLogger(__name__)
 
 PODDEFAULT_FILE_PATH = Path("src/templates/feature_store_poddefault.yaml.j2")
 SECRET_FILE_PATH = Path("src/templates/feature_store_secret.yaml.j2")
+REGISTRY_PREWARM_SCRIPT_FILE_PATH = Path("src/templates/registry_prewarm.py")
 SECRET_NAME = "feature-store-yaml"
+STORE_RELATIONS = ["registry", "offline-store", "online-store"]
+# The db_schema of the offline and online stores in the rendered feature_store.yaml
+STORES_DB_SCHEMA = "public"
 
 
 class FeastIntegratorCharm(ops.CharmBase):
@@ -42,9 +61,48 @@ class FeastIntegratorCharm(ops.CharmBase):
     def __init__(self, framework: ops.Framework):
         super().__init__(framework)
 
-        self.charm_reconciler = CharmReconciler(self)
+        self.tracing = ops.tracing.Tracing(self, tracing_relation_name="charm-tracing")
+
+        self.charm_reconciler = InstrumentedCharmReconciler(self)
         self._namespace = self.model.name
 
+        # Added first, so that the pooled stores are shown in the status of the active charm
+        self.pooled_stores = self.charm_reconciler.add(
+            component=PooledStoresComponent(
+                charm=self,
+                name="pooled-stores",
+                inputs_getter=lambda: PooledStoresInputs(
+                    pooled_stores=self._pooled_stores, stores=STORE_RELATIONS
+                ),
+            ),
+            depends_on=[],
+        )
+
+        self.connection_budget = self.charm_reconciler.add(
+            component=ConnectionBudgetComponent(
+                charm=self,
+                name="connection-budget",
+                inputs_getter=lambda: ConnectionBudgetInputs(
+                    expected_clients=self.config["expected-clients"],
+                    max_connections={
+                        store: self.config[f"{store}-max-connections"] for store in STORE_RELATIONS
+                    },
+                ),
+            ),
+            depends_on=[],
+        )
+
+        self.entity_select_mode = self.charm_reconciler.add(
+            component=EntitySelectModeComponent(
+                charm=self,
+                name="entity-select-mode",
+                inputs_getter=lambda: EntitySelectModeInputs(
+                    entity_select_mode=self.config["offline-store-entity-select-mode"]
+                ),
+            ),
+            depends_on=[],
+        )
+
         self.leadership_gate = self.charm_reconciler.add(
             component=LeadershipGateComponent(
                 charm=self,
@@ -55,14 +113,29 @@ class FeastIntegratorCharm(ops.CharmBase):
 
         self.offline_store_requirer = self.charm_reconciler.add(
             component=PostgresRequirerComponent(
-                charm=self, relation_name="offline-store", database_name="offline_store"
+                charm=self,
+                relation_name="offline-store",
+                database_name="offline_store",
+                inputs_getter=lambda: PostgresRequirerInputs(
+                    role_settings={
+                        "work_mem": self.config["offline-store-work-mem"],
+                        "statement_timeout": self.config["offline-store-statement-timeout"],
+                        **self._get_pooled_role_settings("offline-store"),
+                    }
+                ),
             ),
             depends_on=[self.leadership_gate],
         )
 
         self.online_store_requirer = self.charm_reconciler.add(
             component=PostgresRequirerComponent(
-                charm=self, relation_name="online-store", database_name="online_store"
+                charm=self,
+                relation_name="online-store",
+                database_name="online_store",
+                inputs_getter=lambda: PostgresRequirerInputs(
+                    plugins=["vector"] if self.config["online-store-vector-enabled"] else [],
+                    role_settings=self._get_pooled_role_settings("online-store"),
+                ),
             ),
             depends_on=[self.leadership_gate],
         )
@@ -84,11 +157,22 @@ class FeastIntegratorCharm(ops.CharmBase):
                         **self.offline_store_requirer.component.fetch_relation_data(),
                         **self.online_store_requirer.component.fetch_relation_data(),
                         **self.registry_requirer.component.fetch_relation_data(),
+                        **self.connection_budget.component.get_pool_sizes(),
                         **{"secret_name": SECRET_NAME},
+                        **{
+                            "online_store_vector_enabled": self.config[
+                                "online-store-vector-enabled"
+                            ],
+                            "offline_store_entity_select_mode": self.config[
+                                "offline-store-entity-select-mode"
+                            ],
+                            "registry_prewarm_enabled": bool(self._registry_prewarm_image),
+                        },
                     }
                 ),
             ),
             depends_on=[
+                self.entity_select_mode,
                 self.offline_store_requirer,
                 self.online_store_requirer,
                 self.registry_requirer,
@@ -98,9 +182,14 @@ class FeastIntegratorCharm(ops.CharmBase):
         self.poddefault_sender = self.charm_reconciler.add(
             component=PodDefaultSenderComponent(
                 charm=self,
-                context={"app_name": self.app.name, "secret_name": SECRET_NAME},
+                context={
+                    "app_name": self.app.name,
+                    "secret_name": SECRET_NAME,
+                    **self._get_registry_prewarm_context(),
+                },
                 path_to_manifest=PODDEFAULT_FILE_PATH,
                 relation_name="pod-defaults",
+                extra_env=self.config["poddefault-env"],
             ),
             depends_on=[self.secret_sender],
         )
@@ -113,10 +202,16 @@ class FeastIntegratorCharm(ops.CharmBase):
                         **self.offline_store_requirer.component.fetch_relation_data(),
                         **self.online_store_requirer.component.fetch_relation_data(),
                         **self.registry_requirer.component.fetch_relation_data(),
+                        **{
+                            "offline_store_entity_select_mode": self.config[
+                                "offline-store-entity-select-mode"
+                            ]
+                        },
                     }
                 ),
             ),
             depends_on=[
+                self.entity_select_mode,
                 self.offline_store_requirer,
                 self.online_store_requirer,
                 self.registry_requirer,
@@ -125,6 +220,112 @@ class FeastIntegratorCharm(ops.CharmBase):
 
         self.charm_reconciler.install_default_event_handlers()
 
+        self.framework.observe(self.on.benchmark_stores_action, self._on_benchmark_stores_action)
+        self.framework.observe(
+            self.on.provision_online_tables_action, self._on_provision_online_tables_action
+        )
+
+    @property
+    def _pooled_stores(self) -> List[str]:
+        """Return the relations of the stores configured as pooled by pgbouncer."""
+        return [
+            store.strip() for store in self.config["pooled-stores"].split(",") if store.strip()
+        ]
+
+    def _get_pooled_role_settings(self, relation_name: str) -> Dict[str, str]:
+        """Return the session defaults needed by Feast when the store is pooled by pgbouncer.
+
+        pgbouncer ignores the `options` startup parameter Feast sets the search_path with, so
+        it is set as a default of the user instead, or reset once the store is no longer pooled.
+        """
+        pooled = relation_name in self._pooled_stores
+        return {"search_path": STORES_DB_SCHEMA if pooled else ""}
+
+    @property
+    def _registry_prewarm_image(self) -> str:
+        """Return the image of the registry pre-warm init container, empty if disabled."""
+        return self.config["registry-prewarm-image"] if self.config["registry-prewarm"] else ""
+
+    def _get_registry_prewarm_context(self) -> Dict[str, str]:
+        """Return the context of the registry pre-warm init container of the PodDefault."""
+        if not self._registry_prewarm_image:
+            return {}
+        return {
+            "registry_prewarm_image": self._registry_prewarm_image,
+            "registry_prewarm_script": REGISTRY_PREWARM_SCRIPT_FILE_PATH.read_text(),
+        }
+
+    def _on_benchmark_stores_action(self, event: ops.ActionEvent):
+        """Measure the latency to each store, with the credentials of its relation."""
+        rounds = event.params["rounds"]
+        results = {}
+        for requirer in (
+            self.registry_requirer.component,
+            self.offline_store_requirer.component,
+            self.online_store_requirer.component,
+        ):
+            try:
+                connection_params = requirer.get_connection_params()
+            except ValueError as e:
+                event.fail(f"{e}, cannot benchmark it.")
+                return
+
+            event.log(f"Running {rounds} rounds against {requirer.relation_name}.")
+            try:
+                latency = benchmark_store(**connection_params, rounds=rounds)
+            except StoreBenchmarkError as e:
+                event.fail(str(e))
+                return
+            results[requirer.relation_name] = latency.to_action_results()
+
+        event.set_results(results)
+
+    def _on_provision_online_tables_action(self, event: ops.ActionEvent):
+        """Create the partitioned online store tables of the given feature views."""
+        feature_views = [
+            name.strip() for name in event.params["feature-views"].split(",") if name.strip()
+        ]
+        if not feature_views:
+            event.fail("No feature view given.")
+            return
+        try:
+            connection_params = self.online_store_requirer.component.get_connection_params()
+        except ValueError as e:
+            event.fail(f"{e}, cannot provision the online store tables.")
+            return
+
+        vector_enabled = self.config["online-store-vector-enabled"]
+        try:
+            layout = OnlineTableLayout(
+                partitions=event.params["partitions"],
+                fillfactor=event.params["fillfactor"],
+                vector_length=self.config["online-store-vector-length"]
+                if vector_enabled
+                else None,
+                vector_index_type=(
+                    self.config["online-store-vector-index-type"] or None
+                    if vector_enabled
+                    else None
+                ),
+            )
+        except ValueError as e:
+            event.fail(f"Invalid online table layout: {e}")
+            return
+
+        try:
+            changes = provision_online_tables(
+                **connection_params,
+                feature_views=feature_views,
+                layout=layout,
+                migrate_existing=event.params["migrate-existing"],
+            )
+        except OnlineStoreTablesError as e:
+            event.fail(str(e))
+            return
+        event.set_results(
+            {"changes": "\n".join(f"{table}: {change}" for table, change in changes.items())}
+        )
+
 
 if __name__ == "__main__":  # pragma: nocover
     ops.main(FeastIntegratorCharm)
@@ -0,0 +1,88 @@
+"""Chisme component to share the connections of each store among the expected Feast clients."""
+
+import dataclasses
+from typing import Dict
+
+from charmed_kubeflow_chisme.components.component import Component
+from ops import ActiveStatus, BlockedStatus, StatusBase
+
+# The most connections a client opens to each store with the defaults of Feast: SQLAlchemy's
+# pool_size and max_overflow for the registry, the max_conn of the online store pool, and a
+# single connection at a time for the offline store
+SQLALCHEMY_POOL_SIZE = 5
+SQLALCHEMY_MAX_OVERFLOW = 10
+FEAST_MAX_CONN = 10
+DEFAULT_CONNECTIONS_PER_CLIENT = {
+    "registry": SQLALCHEMY_POOL_SIZE + SQLALCHEMY_MAX_OVERFLOW,
+    "offline-store": 1,
+    "online-store": FEAST_MAX_CONN,
+}
+
+
+@dataclasses.dataclass
+class ConnectionBudgetInputs:
+    """Defines the required inputs for ConnectionBudgetComponent.
+
+    Attributes:
+        expected_clients: the number of clients of the feature store, 0 to not plan the budget
+        max_connections: the connections the clients can open to each store, by store relation
+    """
+
+    expected_clients: int
+    max_connections: Dict[str, int]
+
+
+class ConnectionBudgetComponent(Component):
+    """Shares the connections of each store among the expected clients of the feature store.
+
+    Each client is given an equal share of the connections of each store, up to the connections
+    it opens with the defaults of Feast. The pool sizes rendered in the feature store
+    configuration are derived from these shares. The component is blocked while a store has
+    fewer connections than the expected clients, as each client is still given one.
+    """
+
+    def get_connections_per_client(self) -> Dict[str, int]:
+        """Return the most connections each client may open to each store, by store relation.
+
+        Returns an empty dict if the budget is not planned.
+        """
+        inputs = self._inputs_getter()
+        if inputs.expected_clients <= 0:
+            return {}
+        return {
+            store: max(1, min(default, inputs.max_connections[store] // inputs.expected_clients))
+            for store, default in DEFAULT_CONNECTIONS_PER_CLIENT.items()
+        }
+
+    def get_pool_sizes(self) -> Dict[str, int]:
+        """Return the pool sizes of the clients, as the context of the feature store template.
+
+        Returns an empty dict if the budget is not planned.
+        """
+        connections_per_client = self.get_connections_per_client()
+        if not connections_per_client:
+            return {}
+        registry_connections = connections_per_client["registry"]
+        registry_pool_size = min(SQLALCHEMY_POOL_SIZE, registry_connections)
+        return {
+            "registry_pool_size": registry_pool_size,
+            "registry_max_overflow": registry_connections - registry_pool_size,
+            "online_store_min_conn": 1,
+            "online_store_max_conn": connections_per_client["online-store"],
+        }
+
+    def get_status(self) -> StatusBase:
+        """Return this component's status based on the connections of each store."""
+        inputs = self._inputs_getter()
+        tight_stores = [
+            store
+            for store, max_connections in inputs.max_connections.items()
+            if max_connections < inputs.expected_clients
+        ]
+        if tight_stores:
+            # We need the user to raise the connection limits, or to pool the connections.
+            return BlockedStatus(
+                f"Fewer connections than the {inputs.expected_clients} expected clients to"
+                f" {', '.join(tight_stores)}"
+            )
+        return ActiveStatus()
@@ -1,32 +1,73 @@
 """Reusable Chisme component to manage the requirer side of PostgreSQL relation."""
 
+import dataclasses
+import hashlib
+import json
 import logging
-from typing import Dict
+from typing import Callable, Dict, List, Optional
 
 from charmed_kubeflow_chisme.components.component import Component
 from charms.data_platform_libs.v0.data_interfaces import (
     DatabaseRequires,
     DataInterfacesError,
 )
-from ops import ActiveStatus, BlockedStatus, CharmBase, StatusBase, WaitingStatus
+from ops import ActiveStatus, BlockedStatus, CharmBase, StatusBase, StoredState, WaitingStatus
+
+from role_settings import RoleSettingsError, set_role_settings
 
 logger = logging.getLogger(__name__)
 
 
+@dataclasses.dataclass
+class PostgresRequirerInputs:
+    """Defines the optional inputs for PostgresRequirerComponent.
+
+    Attributes:
+        plugins: the plugins that must be enabled in the database
+        role_settings: the session defaults of the relation user, an empty value resetting one
+    """
+
+    plugins: List[str] = dataclasses.field(default_factory=list)
+    role_settings: Dict[str, str] = dataclasses.field(default_factory=dict)
+
+
 class PostgresRequirerComponent(Component):
     """A Reusable component responsible for handling the relation with PostgreSQL charm.
 
+    When given inputs, the plugins they list must be enabled in the database for the component
+    to be active. A plugin found enabled is kept in StoredState, with the endpoint of the
+    database, so that the database is only connected to until all plugins are found enabled.
+
+    The role settings of the inputs are set by the leader as session defaults of the relation
+    user, and so apply to every client connecting with its credentials. A hash of the settings
+    applied is kept in StoredState, so that the database is only connected to when they change.
+
     Args:
         charm(CharmBase): the requirer charm
         relation_name(str): name of the relation that uses the postgresql_client interface
         database_name(str): name of the database requested by the requirer
+        inputs_getter(Callable, Optional): returns the PostgresRequirerInputs
     """
 
-    def __init__(self, charm: CharmBase, relation_name: str, database_name: str):
-        super().__init__(charm, relation_name)
+    _stored = StoredState()
+
+    def __init__(
+        self,
+        charm: CharmBase,
+        relation_name: str,
+        database_name: str,
+        inputs_getter: Optional[Callable[[], PostgresRequirerInputs]] = None,
+    ):
+        super().__init__(charm, relation_name, inputs_getter=inputs_getter)
         self.relation_name = relation_name
         self.charm = charm
         self.database_name = database_name
+        self._stored.set_default(
+            plugins_endpoint=None, enabled_plugins=[], role_settings_hash=None
+        )
+        # the plugins found disabled in this hook, by endpoint
+        self._disabled_plugins: Dict[str, List[str]] = {}
+        self._role_settings_error: Optional[str] = None
 
         self.database = DatabaseRequires(
             charm=charm, relation_name=relation_name, database_name=database_name
@@ -66,6 +107,74 @@ class PostgresRequirerComponent(Component):
             return db_data
         return {}
 
+    def get_connection_params(self) -> Dict[str, str]:
+        """Return the host, port, database, user and password to connect to the database with.
+
+        Raises:
+            ValueError: if the relation data cannot be read or is empty
+        """
+        try:
+            db_data = self.fetch_relation_data()
+        except (DataInterfacesError, KeyError) as e:
+            raise ValueError(f"Failed to read the {self.relation_name} relation data: {e}") from e
+        if not db_data:
+            raise ValueError(f"No {self.relation_name} relation data")
+        prefix = f"{self.database_name}_"
+        return {key.removeprefix(prefix): value for key, value in db_data.items()}
+
+    def get_disabled_plugins(self, connection_params: Dict[str, str]) -> List[str]:
+        """Return the plugins listed in the inputs that are not enabled in the database."""
+        plugins = self._inputs_getter().plugins if self._inputs_getter else []
+        if not plugins:
+            return []
+        endpoint = "{host}:{port}/{database}".format_map(connection_params)
+        if endpoint != self._stored.plugins_endpoint:
+            self._stored.plugins_endpoint = endpoint
+            self._stored.enabled_plugins = []
+
+        if endpoint not in self._disabled_plugins:
+            self._disabled_plugins = {endpoint: []}
+            for plugin in plugins:
+                if plugin in self._stored.enabled_plugins:
+                    continue
+                if self.database.is_postgresql_plugin_enabled(plugin):
+                    self._stored.enabled_plugins.append(plugin)
+                else:
+                    self._disabled_plugins[endpoint].append(plugin)
+        return self._disabled_plugins[endpoint]
+
+    def _configure_app_leader(self, event):
+        """Set the role settings of the inputs as session defaults of the relation user."""
+        role_settings = self._inputs_getter().role_settings if self._inputs_getter else {}
+        if not any(role_settings.values()) and self._stored.role_settings_hash is None:
+            # Nothing to set, and nothing set before to reset
+            return
+        try:
+            connection_params = self.get_connection_params()
+        except ValueError:
+            # Reported as waiting by get_status
+            return
+
+        serialized = json.dumps(
+            {
+                "endpoint": "{host}:{port}/{database}".format_map(connection_params),
+                "user": connection_params["user"],
+                "role_settings": role_settings,
+            },
+            sort_keys=True,
+        )
+        role_settings_hash = hashlib.sha256(serialized.encode()).hexdigest()
+        if role_settings_hash == self._stored.role_settings_hash:
+            logger.debug(f"Role settings of {self.relation_name} unchanged, skipping.")
+            return
+        try:
+            set_role_settings(**connection_params, settings=role_settings)
+        except RoleSettingsError as e:
+            logger.error(str(e))
+            self._role_settings_error = str(e)
+            return
+        self._stored.role_settings_hash = role_settings_hash
+
     def get_status(self) -> StatusBase:
         """Return this component's status based on the presence of the relation and its data."""
         if not self.charm.model.get_relation(self.relation_name):
@@ -73,11 +182,20 @@ class PostgresRequirerComponent(Component):
             return BlockedStatus(f"Please add the missing relation: {self.relation_name}")
 
         try:
-            data = self.fetch_relation_data()
-            if not data:
-                raise ValueError("Relation data is empty")
-        except (DataInterfacesError, KeyError, ValueError):
+            connection_params = self.get_connection_params()
+        except ValueError:
             # We need the charms to finish integrating.
             return WaitingStatus(f"Waiting for {self.relation_name} relation data")
-        else:
-            return ActiveStatus()
+
+        if self._role_settings_error:
+            # We need the user to fix the settings in the charm config.
+            return BlockedStatus(self._role_settings_error)
+
+        disabled_plugins = self.get_disabled_plugins(connection_params)
+        if disabled_plugins:
+            # We need the user to enable the plugins on the database charm.
+            return BlockedStatus(
+                f"Please enable the {', '.join(disabled_plugins)} plugin(s) of the"
+                f" {self.relation_name} database"
+            )
+        return ActiveStatus()
@@ -0,0 +1,38 @@
+"""Chisme component to validate the entity select mode of the offline store."""
+
+import dataclasses
+
+from charmed_kubeflow_chisme.components.component import Component
+from charms.feast_integrator.v1.feast_store_configuration import ENTITY_SELECT_MODES
+from ops import ActiveStatus, BlockedStatus, StatusBase
+
+
+@dataclasses.dataclass
+class EntitySelectModeInputs:
+    """Defines the required inputs for EntitySelectModeComponent.
+
+    Attributes:
+        entity_select_mode: how the offline store joins entity dataframes, as configured
+    """
+
+    entity_select_mode: str
+
+
+class EntitySelectModeComponent(Component):
+    """Validates the configured entity select mode of the offline store.
+
+    The mode is rendered in both the feature_store.yaml Secret and the feast-configuration
+    relation, so the Components sending them should depend on this one, for an unsupported mode
+    to block the charm before either is sent.
+    """
+
+    def get_status(self) -> StatusBase:
+        """Return this component's status based on the configured entity select mode."""
+        entity_select_mode = self._inputs_getter().entity_select_mode
+        if entity_select_mode not in ENTITY_SELECT_MODES:
+            # We need the user to fix the charm config.
+            return BlockedStatus(
+                f"Unsupported offline-store-entity-select-mode {entity_select_mode}, expected"
+                f" one of {', '.join(ENTITY_SELECT_MODES)}"
+            )
+        return ActiveStatus()
@@ -1,7 +1,10 @@
 """Chisme component to manage the requirer (in this case the sender) of pod-defaults relation."""
 
+import re
 from pathlib import Path
+from typing import Dict, Optional
 
+import yaml
 from charmed_kubeflow_chisme.components.component import Component
 from charms.resource_dispatcher.v0.resource_dispatcher import (
     KubernetesManifest,
@@ -10,6 +13,10 @@ from charms.resource_dispatcher.v0.resource_dispatcher import (
 from jinja2 import Template
 from ops import ActiveStatus, BlockedStatus, CharmBase, StatusBase
 
+# The environment variables set by the PodDefault itself, which cannot be overridden
+RESERVED_ENV = ("FEAST_FS_YAML_FILE_PATH", "FEAST_FS_PREWARMED_YAML_FILE_PATH")
+ENV_NAME_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
 
 class PodDefaultSenderComponent(Component):
     """Sends Feast configuration PodDefault via the kubernetes_manifest interface.
@@ -17,11 +24,16 @@ class PodDefaultSenderComponent(Component):
     A Component that renders and sends the feast configuration PodDefault over
     the kubernetes_manifest interface.
 
+    The extra environment variables are given as a YAML mapping of names to values, as set in
+    the charm config. The PodDefault is sent again on config-changed, so that changes to them
+    reach the user namespaces.
+
     Args:
         charm (CharmBase): the requirer charm
         context (dict[str, str]): the context of the PodDefault
         path_to_manifest(Path): Path to the manifest to render
         relation_name (str): name of the relation that uses the kubernetes_manifest interface
+        extra_env (str, Optional): YAML mapping of the extra environment variables to set
     """
 
     def __init__(
@@ -30,12 +42,20 @@ class PodDefaultSenderComponent(Component):
         context: dict[str, str],
         path_to_manifest: Path,
         relation_name: str = "pod-defaults",
+        extra_env: str = "",
     ):
         super().__init__(charm, relation_name)
         self.charm = charm
         self.context = context
         self.path_to_manifest = path_to_manifest
         self.relation_name = relation_name
+        self._extra_env_error: Optional[str] = None
+        try:
+            self.extra_env = parse_extra_env(extra_env)
+        except ValueError as e:
+            # Rendered without the extra environment variables until they are fixed
+            self._extra_env_error = str(e)
+            self.extra_env = {}
 
         self.create_poddefault_requirer()
         self._events_to_observe = [
@@ -47,14 +67,16 @@ class PodDefaultSenderComponent(Component):
         """Create the poddefault manifests and requirer."""
         # Load and render the PodDefault
         poddefault_template = Template(self.path_to_manifest.read_text())
-        rendered_poddefault = poddefault_template.render(**self.context)
+        rendered_poddefault = poddefault_template.render(**self.context, extra_env=self.extra_env)
         self.manifests_items = [KubernetesManifest(rendered_poddefault)]
 
-        # Create manifests requirer for PodDefault
+        # Create manifests requirer for PodDefault, whose data is written with
+        # RelationDataContent.update, so unchanged manifests do not call relation-set
         self.manifests_requirer = KubernetesManifestsRequirer(
             charm=self.charm,
             relation_name=self.relation_name,
             manifests_items=self.manifests_items,
+            refresh_event=self.charm.on.config_changed,
         )
 
     def get_status(self) -> StatusBase:
@@ -62,4 +84,32 @@ class PodDefaultSenderComponent(Component):
         if not self.charm.model.get_relation(self.relation_name):
             # We need the user to do 'juju integrate'.
             return BlockedStatus(f"Please add the missing relation: {self.relation_name}")
+        if self._extra_env_error:
+            # We need the user to fix the charm config.
+            return BlockedStatus(self._extra_env_error)
         return ActiveStatus()
+
+
+def parse_extra_env(extra_env: str) -> Dict[str, str]:
+    """Return the environment variables of a YAML mapping of names to scalar values.
+
+    Raises:
+        ValueError: if the mapping is invalid
+    """
+    if not extra_env.strip():
+        return {}
+    try:
+        env = yaml.safe_load(extra_env)
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid YAML in the environment variables: {e}") from e
+    if not isinstance(env, dict):
+        raise ValueError("The environment variables must be a mapping of names to values")
+
+    for name, value in env.items():
+        if not isinstance(name, str) or not ENV_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid environment variable name {name}")
+        if name in RESERVED_ENV:
+            raise ValueError(f"Environment variable {name} is set by the charm")
+        if not isinstance(value, (str, int, float, bool)):
+            raise ValueError(f"Environment variable {name} must have a scalar value")
+    return {name: str(value) for name, value in env.items()}
@@ -0,0 +1,44 @@
+"""Chisme component to report the stores whose connections are pooled by pgbouncer."""
+
+import dataclasses
+from typing import List
+
+from charmed_kubeflow_chisme.components.component import Component
+from ops import ActiveStatus, BlockedStatus, StatusBase
+
+
+@dataclasses.dataclass
+class PooledStoresInputs:
+    """Defines the required inputs for PooledStoresComponent.
+
+    Attributes:
+        pooled_stores: the relations of the stores integrated with pgbouncer, as configured
+        stores: the relations of all the stores
+    """
+
+    pooled_stores: List[str]
+    stores: List[str]
+
+
+class PooledStoresComponent(Component):
+    """Reports the stores integrated with a pgbouncer charm rather than with the database.
+
+    pgbouncer provides the same postgresql_client interface as the database charms, so which
+    stores are pooled is configured rather than read from the relations. As the status of the
+    charm is that of its first Component with the highest priority, this Component should be
+    added first for the pooled stores to be shown while the charm is active.
+    """
+
+    def get_status(self) -> StatusBase:
+        """Return this component's status based on the configured pooled stores."""
+        inputs = self._inputs_getter()
+        unknown_stores = [store for store in inputs.pooled_stores if store not in inputs.stores]
+        if unknown_stores:
+            # We need the user to fix the charm config.
+            return BlockedStatus(
+                f"Unknown store(s) {', '.join(unknown_stores)}, expected"
+                f" {', '.join(inputs.stores)}"
+            )
+        if not inputs.pooled_stores:
+            return ActiveStatus()
+        return ActiveStatus(f"{', '.join(inputs.pooled_stores)} pooled by pgbouncer")
@@ -47,6 +47,9 @@ class FeastSecretSenderComponent(Component):
         self.charm = charm
         self.path_to_manifest = path_to_manifest
         self.relation_name = relation_name
+        # The template is compiled, and the configuration sent, at most once per dispatch
+        self._template = None
+        self._sent_configuration = None
 
         self._manifests_requirer_wrapper = KubernetesManifestRequirerWrapper(
             charm=self.charm, relation_name=self.relation_name
@@ -63,16 +66,20 @@ class FeastSecretSenderComponent(Component):
         context = self._inputs_getter().context
 
         # Load and render the Feast config template
-        config_template = Template(self.path_to_manifest.read_text())
-        rendered_secret = config_template.render(context)
+        if self._template is None:
+            self._template = Template(self.path_to_manifest.read_text())
+        rendered_secret = self._template.render(context)
 
         return rendered_secret
 
     def send_configuration(self):
         """Render the manifests and send the configuration over the relation."""
         rendered_configuration = self.render_manifests()
+        if rendered_configuration == self._sent_configuration:
+            return
         secret_manifests = [KubernetesManifest(rendered_configuration)]
         self._manifests_requirer_wrapper.send_data(secret_manifests)
+        self._sent_configuration = rendered_configuration
 
     def get_status(self) -> StatusBase:
         """Return this component's status based on the relation."""
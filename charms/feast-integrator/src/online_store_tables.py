@@ -0,0 +1,241 @@
+# Copyright 2026 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Provision the Postgres tables of the Feast online store, hash partitioned on the entity key.
+
+Feast creates the table of each feature view in the online store on `feast apply`, unpartitioned,
+with `CREATE TABLE IF NOT EXISTS` and `CREATE INDEX IF NOT EXISTS <table>_ek`. Tables created
+here beforehand have the columns of Feast 0.49, in the same order, so Feast uses them as they are,
+but:
+* are hash partitioned on the entity key, so that the index of each partition stays small enough
+  for point lookups and upserts of tens of millions of entity keys,
+* have a single index, the primary key used by both lookups and upserts, named <table>_ek so that
+  Feast does not add a second, redundant index on the entity key,
+* leave free space in each page (fillfactor), so that upserts of existing keys can be HOT updates.
+
+With vector search enabled, the embeddings column is created with the pgvector type Feast uses,
+and an approximate nearest neighbour index is created on it, in new and existing tables alike.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# The project of the feature_store.yaml rendered by the charm
+FEAST_PROJECT = "feast_project"
+
+CREATED = "created"
+MIGRATED = "migrated {rows} rows"
+ALREADY_PARTITIONED = "already partitioned, left unchanged"
+NOT_MIGRATED = "exists unpartitioned, left unchanged as migrate-existing is false"
+VECTOR_INDEX_CREATED = "{index_type} vector index created"
+VECTOR_INDEX_TYPES = ("hnsw", "ivfflat")
+# The bounds Postgres accepts for the number of hash partitions and the fillfactor of a table
+MIN_PARTITIONS = 1
+MIN_FILLFACTOR = 10
+MAX_FILLFACTOR = 100
+
+
+class OnlineStoreTablesError(Exception):
+    """Raised when the tables of the online store cannot be provisioned."""
+
+
+@dataclass
+class OnlineTableLayout:
+    """The layout of the partitioned tables of the online store.
+
+    Attributes:
+        partitions (int): number of hash partitions of each table
+        fillfactor (int): percentage of each page of the partitions filled by inserts
+        vector_length (int, optional): length of the embeddings, if vector search is enabled
+        vector_index_type (str, optional): type of the index of the embeddings, if any
+    """
+
+    partitions: int
+    fillfactor: int
+    vector_length: Optional[int] = None
+    vector_index_type: Optional[str] = None
+
+    def __post_init__(self):
+        if self.partitions < MIN_PARTITIONS:
+            raise ValueError(
+                f"Invalid partitions {self.partitions}, expected at least {MIN_PARTITIONS}"
+            )
+        if not MIN_FILLFACTOR <= self.fillfactor <= MAX_FILLFACTOR:
+            raise ValueError(
+                f"Invalid fillfactor {self.fillfactor}, expected between {MIN_FILLFACTOR} and"
+                f" {MAX_FILLFACTOR}"
+            )
+        if self.vector_index_type and self.vector_index_type not in VECTOR_INDEX_TYPES:
+            raise ValueError(
+                f"Unsupported vector index type {self.vector_index_type}, expected one of"
+                f" {', '.join(VECTOR_INDEX_TYPES)}"
+            )
+
+
+def get_table_name(feature_view: str) -> str:
+    """Return the name Feast gives to the online store table of a feature view."""
+    return f"{FEAST_PROJECT}_{feature_view}"
+
+
+def provision_online_tables(
+    host: str,
+    port: str,
+    database: str,
+    user: str,
+    password: str,
+    feature_views: List[str],
+    layout: OnlineTableLayout,
+    migrate_existing: bool = False,
+    connect_timeout: int = 10,
+) -> Dict[str, str]:
+    """Create the partitioned online store table of each feature view, unless it exists.
+
+    Existing unpartitioned tables are only migrated if migrate_existing is true. A migration
+    copies all the rows of the table in a single transaction, during which the table can neither
+    be read nor written.
+
+    Returns:
+        the change made to the table of each feature view, by table name
+
+    Raises:
+        OnlineStoreTablesError: if the database cannot be connected to or a table provisioned
+    """
+    # Psycopg is imported locally so that hooks other than the action do not import it
+    import psycopg
+
+    changes = {}
+    try:
+        with psycopg.connect(
+            host=host,
+            port=port,
+            dbname=database,
+            user=user,
+            password=password,
+            connect_timeout=connect_timeout,
+            autocommit=True,
+            # The same queries are run for each table, which psycopg would otherwise prepare,
+            # breaking on stores pooled by pgbouncer in transaction mode
+            prepare_threshold=None,
+        ) as connection:
+            for feature_view in feature_views:
+                table = get_table_name(feature_view)
+                # Each table is provisioned in its own transaction
+                with connection.transaction(), connection.cursor() as cursor:
+                    changes[table] = _provision_table(cursor, table, layout, migrate_existing)
+                    if layout.vector_length and layout.vector_index_type:
+                        changes[table] += _create_vector_index(cursor, table, layout)
+                logger.info("Online store table %s: %s", table, changes[table])
+    except psycopg.Error as e:
+        raise OnlineStoreTablesError(
+            f"Failed to provision online store tables in {database} on {host}:{port}: {e}"
+        ) from e
+    return changes
+
+
+def _provision_table(cursor, table: str, layout: OnlineTableLayout, migrate_existing: bool):
+    """Provision the table, and return the change made to it."""
+    from psycopg import sql
+
+    cursor.execute(
+        "SELECT relkind FROM pg_class"
+        " WHERE relname = %s AND relnamespace = current_schema()::regnamespace;",
+        (table,),
+    )
+    row = cursor.fetchone()
+    if row and row[0] == "p":
+        return ALREADY_PARTITIONED
+    if row and not migrate_existing:
+        return NOT_MIGRATED
+
+    if not row:
+        vector_type = (
+            sql.SQL("vector({})").format(sql.Literal(layout.vector_length))
+            if layout.vector_length
+            else sql.SQL("BYTEA")
+        )
+        columns = sql.SQL(
+            """
+            entity_key BYTEA,
+            feature_name TEXT,
+            value BYTEA,
+            value_text TEXT NULL,
+            vector_value {} NULL,
+            event_ts TIMESTAMPTZ,
+            created_ts TIMESTAMPTZ"""
+        ).format(vector_type)
+    else:
+        # Move the existing table, and the index Feast created on it, out of the way
+        unpartitioned = f"{table}__unpartitioned"
+        cursor.execute(
+            sql.SQL("ALTER TABLE {} RENAME TO {};").format(
+                sql.Identifier(table), sql.Identifier(unpartitioned)
+            )
+        )
+        cursor.execute(
+            sql.SQL("ALTER INDEX IF EXISTS {} RENAME TO {};").format(
+                sql.Identifier(f"{table}_ek"), sql.Identifier(f"{unpartitioned}_ek")
+            )
+        )
+        columns = sql.SQL("LIKE {} INCLUDING DEFAULTS").format(sql.Identifier(unpartitioned))
+
+    cursor.execute(
+        sql.SQL(
+            "CREATE TABLE {} ({}, CONSTRAINT {} PRIMARY KEY (entity_key, feature_name))"
+            " PARTITION BY HASH (entity_key);"
+        ).format(sql.Identifier(table), columns, sql.Identifier(f"{table}_ek"))
+    )
+    for remainder in range(layout.partitions):
+        cursor.execute(
+            sql.SQL(
+                "CREATE TABLE {} PARTITION OF {}"
+                " FOR VALUES WITH (MODULUS {}, REMAINDER {}) WITH (fillfactor = {});"
+            ).format(
+                sql.Identifier(f"{table}_p{remainder}"),
+                sql.Identifier(table),
+                sql.Literal(layout.partitions),
+                sql.Literal(remainder),
+                sql.Literal(layout.fillfactor),
+            )
+        )
+
+    if not row:
+        return CREATED
+
+    cursor.execute(
+        sql.SQL("INSERT INTO {} SELECT * FROM {};").format(
+            sql.Identifier(table), sql.Identifier(unpartitioned)
+        )
+    )
+    rows = cursor.rowcount
+    cursor.execute(sql.SQL("DROP TABLE {};").format(sql.Identifier(unpartitioned)))
+    return MIGRATED.format(rows=rows)
+
+
+def _create_vector_index(cursor, table: str, layout: OnlineTableLayout) -> str:
+    """Create the index of the embeddings of the table, and return the change made, if any."""
+    from psycopg import sql
+
+    cursor.execute(
+        "SELECT format_type(a.atttypid, a.atttypmod),"
+        " to_regclass(quote_ident(%s)) IS NOT NULL"
+        " FROM pg_attribute a JOIN pg_class c ON c.oid = a.attrelid"
+        " WHERE c.relname = %s AND c.relnamespace = current_schema()::regnamespace"
+        " AND a.attname = 'vector_value';",
+        (f"{table}_vector", table),
+    )
+    row = cursor.fetchone()
+    if not row or not row[0].startswith("vector") or row[1]:
+        # No embeddings in the table, as Feast created it without vector search, or indexed
+        return ""
+
+    cursor.execute(
+        sql.SQL("CREATE INDEX {} ON {} USING {} (vector_value vector_l2_ops);").format(
+            sql.Identifier(f"{table}_vector"),
+            sql.Identifier(table),
+            sql.SQL(layout.vector_index_type),
+        )
+    )
+    return ", " + VECTOR_INDEX_CREATED.format(index_type=layout.vector_index_type)
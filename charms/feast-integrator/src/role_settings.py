@@ -0,0 +1,61 @@
+# Copyright 2026 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Set the session defaults of the Postgres role that Feast connects to a store with.
+
+Feast connects to its Postgres stores with the credentials rendered in feature_store.yaml, and
+has no option to set session parameters on its connections. Setting them as defaults of that role
+in the database applies them to every session Feast opens, from every namespace.
+"""
+
+import logging
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class RoleSettingsError(Exception):
+    """Raised when the session defaults of the role cannot be set."""
+
+
+def set_role_settings(
+    host: str,
+    port: str,
+    database: str,
+    user: str,
+    password: str,
+    settings: Dict[str, str],
+    connect_timeout: int = 10,
+) -> None:
+    """Set each setting as a session default of the user in the database, or reset it if empty.
+
+    Raises:
+        RoleSettingsError: if the database cannot be connected to or a setting is invalid
+    """
+    # Psycopg is imported locally so that hooks that do not change the settings do not import it
+    import psycopg
+    from psycopg import sql
+
+    try:
+        with psycopg.connect(
+            host=host,
+            port=port,
+            dbname=database,
+            user=user,
+            password=password,
+            connect_timeout=connect_timeout,
+            autocommit=True,
+        ) as connection:
+            for name, value in settings.items():
+                if value:
+                    statement = sql.SQL("ALTER ROLE CURRENT_USER IN DATABASE {} SET {} = {};")
+                    statement = statement.format(
+                        sql.Identifier(database), sql.Identifier(name), sql.Literal(value)
+                    )
+                else:
+                    statement = sql.SQL("ALTER ROLE CURRENT_USER IN DATABASE {} RESET {};")
+                    statement = statement.format(sql.Identifier(database), sql.Identifier(name))
+                connection.execute(statement)
+    except psycopg.Error as e:
+        raise RoleSettingsError(f"Failed to set the session defaults in {database}: {e}") from e
+    logger.info("Set the session defaults of %s in %s: %s", user, database, settings)
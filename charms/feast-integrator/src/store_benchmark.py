@@ -0,0 +1,93 @@
+# Copyright 2026 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Measure the latency of connecting to, and querying, the Postgres databases of the stores."""
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 95, 99)
+QUERY = "SELECT 1;"
+
+
+class StoreBenchmarkError(Exception):
+    """Raised when a store cannot be connected to or queried."""
+
+
+@dataclass
+class StoreLatency:
+    """The latencies, in seconds, measured over the rounds of a store benchmark.
+
+    Attributes:
+        connect (List[float]): time to open a connection, authentication included
+        query (List[float]): time to run a trivial query over an open connection
+    """
+
+    connect: List[float]
+    query: List[float]
+
+    def to_action_results(self) -> Dict[str, str]:
+        """Return the percentiles of the latencies, in milliseconds, as Juju action results."""
+        results = {"rounds": str(len(self.connect))}
+        for name, samples in (("connect", self.connect), ("query", self.query)):
+            for p in PERCENTILES:
+                results[f"{name}-p{p}-ms"] = f"{percentile(samples, p) * 1000:.2f}"
+        return results
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """Return the p-th percentile of samples, using the nearest-rank method."""
+    ordered = sorted(samples)
+    rank = math.ceil(p / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
+
+
+def benchmark_store(
+    host: str,
+    port: str,
+    database: str,
+    user: str,
+    password: str,
+    rounds: int,
+    connect_timeout: int = 10,
+) -> StoreLatency:
+    """Connect to a Postgres database and run a trivial query on it, rounds times.
+
+    Each round opens a new connection, so that the connect latency covers the network, TLS and
+    authentication, while the query latency is one round trip to the database server.
+
+    Raises:
+        StoreBenchmarkError: if the database cannot be connected to or queried
+    """
+    # Psycopg is imported locally so that hooks other than the action do not import it, like
+    # DatabaseRequires.is_postgresql_plugin_enabled does
+    import psycopg
+
+    latency = StoreLatency(connect=[], query=[])
+    for _ in range(rounds):
+        try:
+            start = time.perf_counter()
+            with psycopg.connect(
+                host=host,
+                port=port,
+                dbname=database,
+                user=user,
+                password=password,
+                connect_timeout=connect_timeout,
+            ) as connection:
+                connected = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute(QUERY)
+                    cursor.fetchone()
+                queried = time.perf_counter()
+        except psycopg.Error as e:
+            raise StoreBenchmarkError(f"Failed to query {database} on {host}:{port}: {e}") from e
+        latency.connect.append(connected - start)
+        latency.query.append(queried - connected)
+    logger.debug("Benchmarked %s on %s:%s: %s", database, host, port, latency)
+    return latency
@@ -0,0 +1,64 @@
+# Copyright 2026 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Write a snapshot of the Feast registry to the registry cache of the pod.
+
+This script runs as the init container added by the PodDefault, before the containers of the pod
+start. It loads the registry described by a feature_store.yaml (the SQL registry) and serializes
+it as a file registry, then writes the feature_store.yaml the clients of the pod are pointed at:
+the prewarmed one, whose file registry is the snapshot, or the SQL registry one if the snapshot
+could not be written. A failure to write the snapshot is logged without failing the init
+container, so that the pod still starts, with its clients left to use the SQL registry.
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+logger = logging.getLogger("registry-prewarm")
+
+
+def write_snapshot(feature_store_yaml: Path, destination: Path) -> bool:
+    """Write the registry snapshot, returning whether it was written."""
+    start = time.monotonic()
+    try:
+        from feast import FeatureStore
+
+        store = FeatureStore(fs_yaml_file=feature_store_yaml)
+        registry_proto = store.registry.proto()
+        with tempfile.NamedTemporaryFile(dir=destination.parent, delete=False) as f:
+            f.write(registry_proto.SerializeToString())
+            tmp_path = f.name
+        os.replace(tmp_path, destination)
+    except Exception:
+        logger.exception("Failed to write the registry snapshot, clients must use the registry")
+        return False
+    logger.info("Wrote registry snapshot to %s in %.2fs", destination, time.monotonic() - start)
+    return True
+
+
+def main():
+    """Write the registry snapshot once, and the feature_store.yaml of the clients."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--feature-store-yaml", required=True, type=Path)
+    parser.add_argument("--prewarmed-feature-store-yaml", required=True, type=Path)
+    parser.add_argument("--destination", required=True, type=Path)
+    parser.add_argument("--output-feature-store-yaml", required=True, type=Path)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if write_snapshot(args.feature_store_yaml, args.destination):
+        source = args.prewarmed_feature_store_yaml
+    else:
+        source = args.feature_store_yaml
+    # the clients must always find a configuration, so failing to write it fails the container
+    shutil.copyfile(source, args.output_feature_store_yaml)
+    logger.info("Wrote %s from %s", args.output_feature_store_yaml, source)
+
+
+if __name__ == "__main__":
+    main()
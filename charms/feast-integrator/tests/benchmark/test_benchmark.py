@@ -0,0 +1,85 @@
+import ops
+import ops.testing as testing
+import pytest
+from ops.testing import Context, State
+
+from charm import FeastIntegratorCharm
+
+DATABASE_RELATIONS = ["offline-store", "online-store", "registry"]
+
+
+def new_context() -> Context:
+    return Context(FeastIntegratorCharm)
+
+
+@pytest.fixture(scope="module")
+def state_in():
+    """Return the state of a leader unit with all of its relations established."""
+    relations = []
+    secrets = []
+    for endpoint in DATABASE_RELATIONS:
+        secret = testing.Secret(tracked_content={"username": f"{endpoint}-user", "password": "pw"})
+        secrets.append(secret)
+        relations.append(
+            testing.Relation(
+                endpoint=endpoint,
+                interface="postgresql_client",
+                remote_app_name=f"{endpoint}-postgresql",
+                remote_app_data={
+                    "database": endpoint.replace("-", "_"),
+                    "endpoints": "10.0.0.1:5432",
+                    "secret-user": secret.id,
+                },
+            )
+        )
+    relations.extend(
+        [
+            testing.Relation(endpoint="secrets", interface="kubernetes_manifest"),
+            testing.Relation(endpoint="pod-defaults", interface="kubernetes_manifest"),
+            testing.Relation(
+                endpoint="feast-configuration",
+                interface="feast-configuration",
+                remote_app_data={"lib_api": "1"},
+            ),
+        ]
+    )
+    return State(leader=True, relations=relations, secrets=secrets)
+
+
+@pytest.fixture(scope="module")
+def installed_state(state_in):
+    """Return the state after install and leader-elected, the starting point of later hooks.
+
+    As on a deployed charm, the PodDefault was already sent on leader-elected.
+    """
+    ctx = new_context()
+    state_out = ctx.run(ctx.on.install(), state_in)
+    state_out = ctx.run(ctx.on.leader_elected(), state_out)
+    assert state_out.unit_status == ops.ActiveStatus()
+    return state_out
+
+
+def test_install(state_in, baseline, measure_hook):
+    """Benchmark install with all relations established."""
+    baseline("install", measure_hook(new_context, lambda ctx: ctx.on.install(), state_in))
+
+
+@pytest.mark.parametrize("hook", ["config-changed", "update-status"])
+def test_hook(installed_state, baseline, measure_hook, hook):
+    """Benchmark the hooks that run the reconciler without changing its inputs."""
+    baseline(
+        hook,
+        measure_hook(
+            new_context, lambda ctx: getattr(ctx.on, hook.replace("-", "_"))(), installed_state
+        ),
+    )
+
+
+@pytest.mark.parametrize("endpoint", DATABASE_RELATIONS + ["feast-configuration"])
+def test_relation_changed(installed_state, baseline, measure_hook, endpoint):
+    """Benchmark relation-changed of each relation feeding or fed by the store configuration."""
+    relation = installed_state.get_relations(endpoint)[0]
+    baseline(
+        f"{endpoint}-relation-changed",
+        measure_hook(new_context, lambda ctx: ctx.on.relation_changed(relation), installed_state),
+    )
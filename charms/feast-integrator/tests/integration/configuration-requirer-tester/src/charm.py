@@ -6,7 +6,7 @@
 import logging
 
 import ops
-from charms.feast_integrator.v0.feast_store_configuration import (
+from charms.feast_integrator.v1.feast_store_configuration import (
     FeastStoreConfigurationRelationError,
     FeastStoreConfigurationRequirer,
 )
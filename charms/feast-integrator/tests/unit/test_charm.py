@@ -1,11 +1,21 @@
+import json
+import subprocess
+import sys
 from unittest.mock import patch
 
 import ops
 import ops.testing as testing
+import psycopg
 import pytest
+import yaml
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
 from ops.testing import Context, State
 
-from charm import FeastIntegratorCharm
+from charm import REGISTRY_PREWARM_SCRIPT_FILE_PATH, FeastIntegratorCharm
+from online_store_tables import OnlineTableLayout
+from role_settings import RoleSettingsError
 
 
 @pytest.fixture
@@ -13,6 +23,16 @@ def ctx():
     return Context(FeastIntegratorCharm)
 
 
+@pytest.fixture
+def span_exporter():
+    """Collect the spans of the charm's components in memory, like a local OTLP collector."""
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    with patch("instrumented_charm_reconciler.tracer", provider.get_tracer(__name__)):
+        yield exporter
+
+
 @pytest.mark.parametrize(
     "leader, expected_status",
     [
@@ -203,3 +223,770 @@ def test_configuration_sender_incomplete_data(mock_fetch_relation_data, ctx):
 
     # THEN the unit status is set to BlockedStatus
     assert "Missing required fields" in state_out.unit_status.message
+
+
+def test_component_metrics_logged_and_traced(ctx, span_exporter):
+    """Test the time spent in each component is written to the logs and traces."""
+    # GIVEN the unit is leader and the database relations are added
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+    ]
+    state_in = State(leader=True, relations=relations)
+
+    # WHEN install fires
+    ctx.run(ctx.on.install(), state_in)
+
+    # THEN one JSON line of metrics is logged per executed component
+    metrics = {
+        line["component"]: line
+        for line in (
+            json.loads(log.message.removeprefix("Component metrics: "))
+            for log in ctx.juju_log
+            if log.message.startswith("Component metrics: ")
+        )
+    }
+    assert {"leadership-gate", "offline-store", "online-store", "registry"} <= set(metrics)
+    assert metrics["offline-store"]["configure_charm"]["calls"] == 1
+    assert metrics["offline-store"]["get_status"]["seconds"] >= 0
+
+    # AND each component call is traced in its own span
+    span_names = {span.name for span in span_exporter.get_finished_spans()}
+    assert {"offline-store: configure_charm", "offline-store: get_status"} <= span_names
+
+
+@patch("components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data")
+def test_credentials_rotation_only_rewrites_secret_manifest(mock_fetch_relation_data, ctx):
+    """Test rotated credentials only rewrite the manifests of the secrets relation."""
+    # GIVEN the manifests were sent with the current database credentials
+    mock_fetch_relation_data.return_value = {
+        f"{store}_{key}": value
+        for store in ["registry", "offline_store", "online_store"]
+        for key, value in {
+            "host": "localhost",
+            "port": "5432",
+            "database": store,
+            "user": "myuser",
+            "password": "mypassword",
+        }.items()
+    }
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+        testing.Relation(endpoint="secrets", interface="kubernetes_manifest"),
+        testing.Relation(endpoint="pod-defaults", interface="kubernetes_manifest"),
+    ]
+    state_out = ctx.run(ctx.on.config_changed(), State(leader=True, relations=relations))
+    secrets_data = state_out.get_relations("secrets")[0].local_app_data
+    pod_defaults_data = state_out.get_relations("pod-defaults")[0].local_app_data
+    assert "PodDefault" in pod_defaults_data["kubernetes_manifests"]
+
+    # WHEN the database credentials are rotated
+    mock_fetch_relation_data.return_value = {
+        **mock_fetch_relation_data.return_value,
+        "registry_password": "rotated-password",
+    }
+    with ctx(ctx.on.config_changed(), state_out) as manager:
+        backend = manager.charm.model._backend
+        with patch.object(backend, "relation_set", wraps=backend.relation_set) as relation_set:
+            state_out = manager.run()
+
+    # THEN only the Secret sent over the secrets relation is rewritten
+    secrets_relation = state_out.get_relations("secrets")[0]
+    pod_defaults_relation = state_out.get_relations("pod-defaults")[0]
+    assert "rotated-password" in secrets_relation.local_app_data["kubernetes_manifests"]
+    assert secrets_relation.local_app_data != secrets_data
+    assert pod_defaults_relation.local_app_data == pod_defaults_data
+    assert {call.kwargs["relation_id"] for call in relation_set.call_args_list} == {
+        secrets_relation.id
+    }
+
+
+def _store_relation_data(component) -> dict:
+    """Return the relation data of a store, as fetched by its PostgresRequirerComponent."""
+    fields = {
+        "host": f"{component.relation_name}.example.com",
+        "port": "5432",
+        "database": component.database_name,
+        "user": "myuser",
+        "password": "mypassword",
+    }
+    return {f"{component.database_name}_{key}": value for key, value in fields.items()}
+
+
+@patch("psycopg.connect")
+@patch(
+    "components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data",
+    autospec=True,
+    side_effect=_store_relation_data,
+)
+def test_benchmark_stores_action(_, mock_connect, ctx):
+    """Test the benchmark-stores action reports the latency percentiles of each store."""
+    # GIVEN the database relations are added with the expected data
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+    ]
+    state_in = State(leader=True, relations=relations)
+
+    # WHEN the benchmark-stores action is run with 3 rounds
+    ctx.run(ctx.on.action("benchmark-stores", params={"rounds": 3}), state_in)
+
+    # THEN each store is connected to and queried 3 times, with the credentials of its relation
+    assert mock_connect.call_count == 9
+    assert mock_connect.call_args.kwargs == {
+        "host": "online-store.example.com",
+        "port": "5432",
+        "dbname": "online_store",
+        "user": "myuser",
+        "password": "mypassword",
+        "connect_timeout": 10,
+    }
+    cursor = mock_connect.return_value.__enter__.return_value.cursor.return_value.__enter__
+    assert cursor.return_value.execute.call_count == 9
+
+    # AND the latency percentiles of each store are reported
+    assert set(ctx.action_results) == {"registry", "offline-store", "online-store"}
+    assert set(ctx.action_results["registry"]) == {
+        "rounds",
+        "connect-p50-ms",
+        "connect-p95-ms",
+        "connect-p99-ms",
+        "query-p50-ms",
+        "query-p95-ms",
+        "query-p99-ms",
+    }
+    assert ctx.action_results["registry"]["rounds"] == "3"
+
+
+@patch("components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data")
+def test_benchmark_stores_action_without_relation_data(mock_fetch_relation_data, ctx):
+    """Test the benchmark-stores action fails when a store has no relation data yet."""
+    # GIVEN the database relations are added without data
+    mock_fetch_relation_data.return_value = {}
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+    ]
+    state_in = State(leader=True, relations=relations)
+
+    # WHEN the benchmark-stores action is run
+    # THEN the action fails
+    with pytest.raises(testing.ActionFailed) as e:
+        ctx.run(ctx.on.action("benchmark-stores", params={"rounds": 1}), state_in)
+    assert e.value.message == "No registry relation data, cannot benchmark it."
+
+
+@patch("psycopg.connect", side_effect=psycopg.OperationalError("connection refused"))
+@patch(
+    "components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data",
+    autospec=True,
+    side_effect=_store_relation_data,
+)
+def test_benchmark_stores_action_connection_failed(_, __, ctx):
+    """Test the benchmark-stores action fails when a store cannot be connected to."""
+    # GIVEN the database relations are added with the expected data
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+    ]
+    state_in = State(leader=True, relations=relations)
+
+    # WHEN the benchmark-stores action is run and the registry refuses connections
+    # THEN the action fails with the connection error
+    with pytest.raises(testing.ActionFailed) as e:
+        ctx.run(ctx.on.action("benchmark-stores", params={"rounds": 1}), state_in)
+    assert e.value.message == (
+        "Failed to query registry on registry.example.com:5432: connection refused"
+    )
+
+
+@patch("charm.provision_online_tables", return_value={"feast_project_driver_stats": "created"})
+@patch(
+    "components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data",
+    autospec=True,
+    side_effect=_store_relation_data,
+)
+def test_provision_online_tables_action(_, mock_provision_online_tables, ctx):
+    """Test the provision-online-tables action provisions the tables in the online store."""
+    # GIVEN the online-store relation is added with the expected data
+    relations = [testing.Relation(endpoint="online-store", interface="postgresql_client")]
+    state_in = State(leader=True, relations=relations)
+
+    # WHEN the provision-online-tables action is run
+    params = {
+        "feature-views": "driver_stats, ",
+        "partitions": 8,
+        "fillfactor": 80,
+        "migrate-existing": False,
+    }
+    ctx.run(ctx.on.action("provision-online-tables", params=params), state_in)
+
+    # THEN the tables are provisioned in the online store, with the given layout
+    mock_provision_online_tables.assert_called_once_with(
+        host="online-store.example.com",
+        port="5432",
+        database="online_store",
+        user="myuser",
+        password="mypassword",
+        feature_views=["driver_stats"],
+        layout=OnlineTableLayout(partitions=8, fillfactor=80),
+        migrate_existing=False,
+    )
+    # AND the changes are reported
+    assert ctx.action_results == {"changes": "feast_project_driver_stats: created"}
+
+
+def test_provision_online_tables_action_without_relation(ctx):
+    """Test the provision-online-tables action fails without the online-store relation."""
+    # GIVEN the online-store relation is missing
+    state_in = State(leader=True)
+
+    # WHEN the provision-online-tables action is run
+    # THEN the action fails
+    params = {
+        "feature-views": "driver_stats",
+        "partitions": 8,
+        "fillfactor": 80,
+        "migrate-existing": False,
+    }
+    with pytest.raises(testing.ActionFailed) as e:
+        ctx.run(ctx.on.action("provision-online-tables", params=params), state_in)
+    assert e.value.message == (
+        "No online-store relation data, cannot provision the online store tables."
+    )
+
+
+@patch(
+    "charms.data_platform_libs.v0.data_interfaces.DatabaseRequires.is_postgresql_plugin_enabled",
+    return_value=False,
+)
+@patch(
+    "components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data",
+    autospec=True,
+    side_effect=_store_relation_data,
+)
+def test_vector_enabled_without_vector_plugin(_, mock_is_plugin_enabled, ctx):
+    """Test the charm is blocked when vector search is enabled without the vector plugin."""
+    # GIVEN vector search is enabled and the vector plugin is not enabled in the online store
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+    ]
+    state_in = State(
+        leader=True, relations=relations, config={"online-store-vector-enabled": True}
+    )
+
+    # WHEN install fires
+    state_out = ctx.run(ctx.on.install(), state_in)
+
+    # THEN the plugin is checked once, and the unit is blocked until it is enabled
+    mock_is_plugin_enabled.assert_called_once_with("vector")
+    assert state_out.unit_status == ops.BlockedStatus(
+        "[online-store] Please enable the vector plugin(s) of the online-store database"
+    )
+
+
+@patch(
+    "charms.data_platform_libs.v0.data_interfaces.DatabaseRequires.is_postgresql_plugin_enabled",
+    return_value=True,
+)
+@patch(
+    "components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data",
+    autospec=True,
+    side_effect=_store_relation_data,
+)
+def test_vector_enabled_with_vector_plugin(_, mock_is_plugin_enabled, ctx):
+    """Test the online store is rendered with vector search once the vector plugin is enabled."""
+    # GIVEN vector search is enabled and the vector plugin is enabled in the online store
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+        testing.Relation(endpoint="secrets", interface="kubernetes_manifest"),
+        testing.Relation(endpoint="pod-defaults", interface="kubernetes_manifest"),
+    ]
+    state_in = State(
+        leader=True,
+        relations=relations,
+        config={"online-store-vector-enabled": True, "online-store-vector-length": 768},
+    )
+
+    # WHEN install fires, followed by update-status
+    state_out = ctx.run(ctx.on.install(), state_in)
+    state_out = ctx.run(ctx.on.update_status(), state_out)
+
+    # THEN the plugin is only checked on install, as it was found enabled
+    mock_is_plugin_enabled.assert_called_once_with("vector")
+    # AND the online store of the Secret sent to the user namespaces enables vector search
+    assert state_out.unit_status == ops.ActiveStatus()
+    manifests = json.loads(
+        state_out.get_relations("secrets")[0].local_app_data["kubernetes_manifests"]
+    )
+    feature_store = yaml.safe_load(manifests[0]["stringData"]["feature_store.yaml"])
+    assert feature_store["online_store"]["vector_enabled"] is True
+    assert "vector_len" not in feature_store["online_store"]
+
+
+@patch("components.database_requirer_component.set_role_settings")
+@patch(
+    "components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data",
+    autospec=True,
+    side_effect=_store_relation_data,
+)
+def test_offline_store_performance_options(_, mock_set_role_settings, ctx):
+    """Test the offline store options are set on its user and rendered in the Secret."""
+    # GIVEN the performance options of the offline store are configured
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+        testing.Relation(endpoint="secrets", interface="kubernetes_manifest"),
+        testing.Relation(endpoint="pod-defaults", interface="kubernetes_manifest"),
+    ]
+    state_in = State(
+        leader=True,
+        relations=relations,
+        config={
+            "offline-store-entity-select-mode": "embed_query",
+            "offline-store-work-mem": "256MB",
+            "offline-store-statement-timeout": "",
+        },
+    )
+
+    # WHEN install fires, followed by update-status
+    state_out = ctx.run(ctx.on.install(), state_in)
+    state_out = ctx.run(ctx.on.update_status(), state_out)
+
+    # THEN the session settings are only set on install, as they did not change since
+    mock_set_role_settings.assert_called_once_with(
+        host="offline-store.example.com",
+        port="5432",
+        database="offline_store",
+        user="myuser",
+        password="mypassword",
+        settings={"work_mem": "256MB", "statement_timeout": "", "search_path": ""},
+    )
+    # AND the offline store of the Secret sent to the user namespaces uses the entity select mode
+    assert state_out.unit_status == ops.ActiveStatus()
+    manifests = json.loads(
+        state_out.get_relations("secrets")[0].local_app_data["kubernetes_manifests"]
+    )
+    feature_store = yaml.safe_load(manifests[0]["stringData"]["feature_store.yaml"])
+    assert feature_store["offline_store"]["entity_select_mode"] == "embed_query"
+
+
+@patch(
+    "components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data",
+    autospec=True,
+    side_effect=_store_relation_data,
+)
+def test_offline_store_unsupported_entity_select_mode(_, ctx):
+    """Test the charm is blocked, and sends no configuration, with an unsupported mode."""
+    # GIVEN an unsupported entity select mode is configured
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+        testing.Relation(endpoint="secrets", interface="kubernetes_manifest"),
+        testing.Relation(endpoint="feast-configuration", interface="feast_configuration"),
+    ]
+    state_in = State(
+        leader=True,
+        relations=relations,
+        config={"offline-store-entity-select-mode": "join"},
+    )
+
+    # WHEN install fires
+    state_out = ctx.run(ctx.on.install(), state_in)
+
+    # THEN the unit is blocked, naming the config option
+    assert state_out.unit_status == ops.BlockedStatus(
+        "[entity-select-mode] Unsupported offline-store-entity-select-mode join, expected one of"
+        " temp_table, embed_query"
+    )
+    # AND neither the Secret nor the store configuration are sent
+    assert not state_out.get_relations("secrets")[0].local_app_data
+    assert not state_out.get_relations("feast-configuration")[0].local_app_data
+
+
+@patch("components.database_requirer_component.set_role_settings")
+@patch(
+    "components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data",
+    autospec=True,
+    side_effect=_store_relation_data,
+)
+def test_offline_store_default_options_not_set(_, mock_set_role_settings, ctx):
+    """Test the offline store is not connected to when no session setting is configured."""
+    # GIVEN the offline store session settings are left empty
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+    ]
+
+    # WHEN install fires
+    ctx.run(ctx.on.install(), State(leader=True, relations=relations))
+
+    # THEN no setting is set on the offline store user
+    mock_set_role_settings.assert_not_called()
+
+
+@patch(
+    "components.database_requirer_component.set_role_settings",
+    side_effect=RoleSettingsError("Failed to set the session defaults in offline_store"),
+)
+@patch(
+    "components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data",
+    autospec=True,
+    side_effect=_store_relation_data,
+)
+def test_offline_store_invalid_session_setting(_, __, ctx):
+    """Test the charm is blocked when the offline store session settings cannot be set."""
+    # GIVEN an invalid work_mem is configured
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+    ]
+    state_in = State(leader=True, relations=relations, config={"offline-store-work-mem": "lots"})
+
+    # WHEN install fires
+    state_out = ctx.run(ctx.on.install(), state_in)
+
+    # THEN the unit is blocked with the error
+    assert state_out.unit_status == ops.BlockedStatus(
+        "[offline-store] Failed to set the session defaults in offline_store"
+    )
+
+
+@patch("components.database_requirer_component.set_role_settings")
+@patch(
+    "components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data",
+    autospec=True,
+    side_effect=_store_relation_data,
+)
+def test_pooled_stores(_, mock_set_role_settings, ctx):
+    """Test the pooled stores are shown in the status, with the search_path set on their user."""
+    # GIVEN the online store and the registry are integrated with pgbouncer
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+        testing.Relation(endpoint="secrets", interface="kubernetes_manifest"),
+        testing.Relation(endpoint="pod-defaults", interface="kubernetes_manifest"),
+    ]
+    state_in = State(
+        leader=True, relations=relations, config={"pooled-stores": "online-store, registry"}
+    )
+
+    # WHEN install fires
+    state_out = ctx.run(ctx.on.install(), state_in)
+
+    # THEN the search_path Feast sets at connection time is set on the online store user only,
+    # as the registry does not set it
+    mock_set_role_settings.assert_called_once_with(
+        host="online-store.example.com",
+        port="5432",
+        database="online_store",
+        user="myuser",
+        password="mypassword",
+        settings={"search_path": "public"},
+    )
+    # AND the status shows the pooled stores
+    assert state_out.unit_status == ops.ActiveStatus(
+        "[pooled-stores] online-store, registry pooled by pgbouncer"
+    )
+
+
+def test_pooled_stores_unknown_store(ctx):
+    """Test the charm is blocked when an unknown store is configured as pooled."""
+    # GIVEN an unknown store is configured as pooled
+    state_in = State(leader=True, config={"pooled-stores": "online-store,feature-server"})
+
+    # WHEN install fires
+    state_out = ctx.run(ctx.on.install(), state_in)
+
+    # THEN the unit is blocked until the config is fixed
+    assert state_out.unit_status == ops.BlockedStatus(
+        "[pooled-stores] Unknown store(s) feature-server, expected registry, offline-store,"
+        " online-store"
+    )
+
+
+@pytest.mark.parametrize(
+    "config, expected_registry_pool, expected_online_store_pool",
+    [
+        # The budget is not planned by default, leaving the pool sizes of Feast
+        ({}, {}, {}),
+        # Each of the 20 clients gets 5 of the registry connections, and 10 of the 300 online
+        # store connections, the most it opens by default
+        (
+            {"expected-clients": 20, "online-store-max-connections": 300},
+            {"pool_size": 5, "max_overflow": 0},
+            {"conn_type": "pool", "min_conn": 1, "max_conn": 10},
+        ),
+        (
+            {"expected-clients": 10, "registry-max-connections": 120},
+            {"pool_size": 5, "max_overflow": 7},
+            {"conn_type": "pool", "min_conn": 1, "max_conn": 10},
+        ),
+    ],
+)
+@patch(
+    "components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data",
+    autospec=True,
+    side_effect=_store_relation_data,
+)
+def test_connection_budget_pool_sizes(
+    _, config, expected_registry_pool, expected_online_store_pool, ctx
+):
+    """Test the pool sizes rendered in the Secret share the connections among the clients."""
+    # GIVEN the expected clients and the connections of the stores are configured
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+        testing.Relation(endpoint="secrets", interface="kubernetes_manifest"),
+        testing.Relation(endpoint="pod-defaults", interface="kubernetes_manifest"),
+    ]
+    state_in = State(leader=True, relations=relations, config=config)
+
+    # WHEN install fires
+    state_out = ctx.run(ctx.on.install(), state_in)
+
+    # THEN the pool sizes of the registry and the online store are rendered in the Secret
+    assert state_out.unit_status == ops.ActiveStatus()
+    manifests = json.loads(
+        state_out.get_relations("secrets")[0].local_app_data["kubernetes_manifests"]
+    )
+    feature_store = yaml.safe_load(manifests[0]["stringData"]["feature_store.yaml"])
+    assert feature_store["registry"]["sqlalchemy_config_kwargs"] == {
+        "echo": False,
+        "pool_pre_ping": True,
+        **expected_registry_pool,
+    }
+    online_store_pool = {
+        key: value
+        for key, value in feature_store["online_store"].items()
+        if key in ("conn_type", "min_conn", "max_conn")
+    }
+    assert online_store_pool == expected_online_store_pool
+
+
+@patch(
+    "components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data",
+    autospec=True,
+    side_effect=_store_relation_data,
+)
+def test_connection_budget_too_tight(_, ctx):
+    """Test the charm is blocked when stores have fewer connections than expected clients."""
+    # GIVEN more clients are expected than the registry and offline store have connections
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+        testing.Relation(endpoint="secrets", interface="kubernetes_manifest"),
+        testing.Relation(endpoint="pod-defaults", interface="kubernetes_manifest"),
+    ]
+    state_in = State(
+        leader=True,
+        relations=relations,
+        config={"expected-clients": 200, "online-store-max-connections": 400},
+    )
+
+    # WHEN install fires
+    state_out = ctx.run(ctx.on.install(), state_in)
+
+    # THEN the unit is blocked, naming the stores short of connections
+    assert state_out.unit_status == ops.BlockedStatus(
+        "[connection-budget] Fewer connections than the 200 expected clients to registry,"
+        " offline-store"
+    )
+    # AND each client is still given a single registry connection
+    manifests = json.loads(
+        state_out.get_relations("secrets")[0].local_app_data["kubernetes_manifests"]
+    )
+    feature_store = yaml.safe_load(manifests[0]["stringData"]["feature_store.yaml"])
+    assert feature_store["registry"]["sqlalchemy_config_kwargs"]["pool_size"] == 1
+    assert feature_store["registry"]["sqlalchemy_config_kwargs"]["max_overflow"] == 0
+    assert feature_store["online_store"]["max_conn"] == 2
+
+
+def test_poddefault_extra_env(ctx):
+    """Test the configured environment variables are rendered in the PodDefault."""
+    # GIVEN runtime environment variables are configured
+    relations = [testing.Relation(endpoint="pod-defaults", interface="kubernetes_manifest")]
+    state_in = State(
+        leader=True,
+        relations=relations,
+        config={"poddefault-env": '{OMP_NUM_THREADS: 4, FEAST_USAGE: "False"}'},
+    )
+
+    # WHEN config-changed fires
+    state_out = ctx.run(ctx.on.config_changed(), state_in)
+
+    # THEN the PodDefault sets them after the path of the feature store configuration
+    manifests = json.loads(
+        state_out.get_relations("pod-defaults")[0].local_app_data["kubernetes_manifests"]
+    )
+    assert manifests[0]["spec"]["env"] == [
+        {"name": "FEAST_FS_YAML_FILE_PATH", "value": "/feast/feature_store.yaml"},
+        {"name": "OMP_NUM_THREADS", "value": "4"},
+        {"name": "FEAST_USAGE", "value": "False"},
+    ]
+    # AND the registry is not pre-warmed by default
+    assert "initContainers" not in manifests[0]["spec"]
+
+
+@pytest.mark.parametrize(
+    "extra_env, expected_message",
+    [
+        ("[OMP_NUM_THREADS]", "The environment variables must be a mapping of names to values"),
+        ("{OMP-NUM-THREADS: 4}", "Invalid environment variable name OMP-NUM-THREADS"),
+        (
+            "{FEAST_FS_YAML_FILE_PATH: /tmp/feature_store.yaml}",
+            "Environment variable FEAST_FS_YAML_FILE_PATH is set by the charm",
+        ),
+        (
+            "{FEAST_FS_PREWARMED_YAML_FILE_PATH: /tmp/feature_store.yaml}",
+            "Environment variable FEAST_FS_PREWARMED_YAML_FILE_PATH is set by the charm",
+        ),
+        (
+            "{OMP_NUM_THREADS: [4]}",
+            "Environment variable OMP_NUM_THREADS must have a scalar value",
+        ),
+    ],
+)
+@patch(
+    "components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data",
+    autospec=True,
+    side_effect=_store_relation_data,
+)
+def test_poddefault_invalid_extra_env(_, extra_env, expected_message, ctx):
+    """Test the charm is blocked when the configured environment variables are invalid."""
+    # GIVEN invalid runtime environment variables are configured
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+        testing.Relation(endpoint="secrets", interface="kubernetes_manifest"),
+        testing.Relation(endpoint="pod-defaults", interface="kubernetes_manifest"),
+    ]
+    state_in = State(leader=True, relations=relations, config={"poddefault-env": extra_env})
+
+    # WHEN config-changed fires
+    state_out = ctx.run(ctx.on.config_changed(), state_in)
+
+    # THEN the unit is blocked with the error
+    assert state_out.unit_status == ops.BlockedStatus(f"[pod-defaults] {expected_message}")
+
+
+@patch(
+    "components.database_requirer_component.PostgresRequirerComponent.fetch_relation_data",
+    autospec=True,
+    side_effect=_store_relation_data,
+)
+def test_registry_prewarm(_, ctx):
+    """Test the PodDefault pre-warms the registry into a cache the Secret points clients at."""
+    # GIVEN the registry pre-warm is enabled
+    relations = [
+        testing.Relation(endpoint="offline-store", interface="postgresql_client"),
+        testing.Relation(endpoint="online-store", interface="postgresql_client"),
+        testing.Relation(endpoint="registry", interface="postgresql_client"),
+        testing.Relation(endpoint="secrets", interface="kubernetes_manifest"),
+        testing.Relation(endpoint="pod-defaults", interface="kubernetes_manifest"),
+    ]
+    state_in = State(
+        leader=True,
+        relations=relations,
+        config={"registry-prewarm": True, "registry-prewarm-image": "feast:0.49.0"},
+    )
+
+    # WHEN config-changed fires
+    state_out = ctx.run(ctx.on.config_changed(), state_in)
+
+    # THEN the PodDefault adds an init container writing the registry to an emptyDir
+    assert state_out.unit_status == ops.ActiveStatus()
+    spec = json.loads(
+        state_out.get_relations("pod-defaults")[0].local_app_data["kubernetes_manifests"]
+    )[0]["spec"]
+    (init_container,) = spec["initContainers"]
+    assert init_container["image"] == "feast:0.49.0"
+    assert init_container["command"][:2] == ["python3", "-c"]
+    assert "store.registry.proto()" in init_container["command"][2]
+    assert init_container["command"][3:] == [
+        "--feature-store-yaml",
+        "/feast/feature_store.yaml",
+        "--prewarmed-feature-store-yaml",
+        "/feast/feature_store_prewarmed.yaml",
+        "--destination",
+        "/feast-registry/registry.db",
+        "--output-feature-store-yaml",
+        "/feast-registry/feature_store.yaml",
+    ]
+    assert {"name": "feast-registry-cache", "emptyDir": {}} in spec["volumes"]
+    assert {
+        "name": "FEAST_FS_PREWARMED_YAML_FILE_PATH",
+        "value": "/feast-registry/feature_store.yaml",
+    } in spec["env"]
+
+    # AND the prewarmed feature store configuration of the Secret uses the cached registry
+    manifests = json.loads(
+        state_out.get_relations("secrets")[0].local_app_data["kubernetes_manifests"]
+    )
+    feature_store = yaml.safe_load(manifests[0]["stringData"]["feature_store.yaml"])
+    prewarmed_feature_store = yaml.safe_load(
+        manifests[0]["stringData"]["feature_store_prewarmed.yaml"]
+    )
+    assert prewarmed_feature_store["registry"] == {
+        "registry_type": "file",
+        "path": "/feast-registry/registry.db",
+        "cache_ttl_seconds": 0,
+    }
+    assert prewarmed_feature_store["online_store"] == feature_store["online_store"]
+
+
+def test_registry_prewarm_falls_back_to_registry(tmp_path):
+    """Test the init container points clients at the SQL registry if the snapshot fails."""
+    # GIVEN a registry the snapshot cannot be written from
+    feature_store_yaml = tmp_path / "feature_store.yaml"
+    feature_store_yaml.write_text(
+        "project: feast_project\n"
+        "registry:\n"
+        "  registry_type: sql\n"
+        "  path: postgresql://user:pw@127.0.0.1:1/registry\n"
+    )
+    prewarmed_feature_store_yaml = tmp_path / "feature_store_prewarmed.yaml"
+    prewarmed_feature_store_yaml.write_text("registry: /feast-registry/registry.db\n")
+    registry_cache = tmp_path / "feast-registry"
+    registry_cache.mkdir()
+
+    # WHEN the init container runs the pre-warm script
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            REGISTRY_PREWARM_SCRIPT_FILE_PATH.read_text(),
+            "--feature-store-yaml",
+            str(feature_store_yaml),
+            "--prewarmed-feature-store-yaml",
+            str(prewarmed_feature_store_yaml),
+            "--destination",
+            str(registry_cache / "registry.db"),
+            "--output-feature-store-yaml",
+            str(registry_cache / "feature_store.yaml"),
+        ],
+        capture_output=True,
+        check=True,
+    )
+
+    # THEN it succeeds, with the clients configuration using the SQL registry
+    assert not (registry_cache / "registry.db").exists()
+    assert (registry_cache / "feature_store.yaml").read_text() == feature_store_yaml.read_text()
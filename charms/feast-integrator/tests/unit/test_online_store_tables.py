@@ -0,0 +1,198 @@
+from unittest.mock import patch
+
+import pytest
+
+from online_store_tables import (
+    ALREADY_PARTITIONED,
+    CREATED,
+    NOT_MIGRATED,
+    OnlineTableLayout,
+    provision_online_tables,
+)
+
+CONNECTION_PARAMS = {
+    "host": "localhost",
+    "port": "5432",
+    "database": "online_store",
+    "user": "myuser",
+    "password": "mypassword",
+}
+LAYOUT = OnlineTableLayout(partitions=4, fillfactor=90)
+# The columns of the online store tables created by Feast 0.49, in order
+FEAST_COLUMNS = [
+    "entity_key BYTEA",
+    "feature_name TEXT",
+    "value BYTEA",
+    "value_text TEXT NULL",
+    "vector_value {vector_type} NULL",
+    "event_ts TIMESTAMPTZ",
+    "created_ts TIMESTAMPTZ",
+]
+
+
+@pytest.fixture
+def cursor():
+    """Return the cursor of a mocked psycopg connection."""
+    with patch("psycopg.connect") as mock_connect:
+        connection = mock_connect.return_value.__enter__.return_value
+        yield connection.cursor.return_value.__enter__.return_value
+
+
+def _columns(statement: str):
+    """Return the column definitions of a CREATE TABLE statement, in order."""
+    definitions = statement[statement.index("(") + 1 : statement.index(", CONSTRAINT")]
+    return [" ".join(definition.split()) for definition in definitions.split(",")]
+
+
+def _statements(cursor):
+    return [
+        call.args[0] if isinstance(call.args[0], str) else call.args[0].as_string()
+        for call in cursor.execute.call_args_list
+    ]
+
+
+def test_provision_online_tables_creates_missing_table(cursor):
+    """Test a missing table is created with its hash partitions."""
+    # GIVEN the table of the feature view does not exist
+    cursor.fetchone.return_value = None
+
+    # WHEN the tables are provisioned
+    changes = provision_online_tables(
+        **CONNECTION_PARAMS, feature_views=["driver_stats"], layout=LAYOUT
+    )
+
+    # THEN the table is created, partitioned on the entity key, with its primary key named as
+    # the index Feast creates
+    assert changes == {"feast_project_driver_stats": CREATED}
+    statements = _statements(cursor)
+    assert _columns(statements[1]) == [
+        column.format(vector_type="BYTEA") for column in FEAST_COLUMNS
+    ]
+    assert "PARTITION BY HASH (entity_key)" in statements[1]
+    assert 'CONSTRAINT "feast_project_driver_stats_ek" PRIMARY KEY' in statements[1]
+    # AND each partition is created with the fillfactor
+    assert len(statements) == 2 + LAYOUT.partitions
+    assert statements[-1] == (
+        'CREATE TABLE "feast_project_driver_stats_p3" PARTITION OF "feast_project_driver_stats"'
+        " FOR VALUES WITH (MODULUS 4, REMAINDER 3) WITH (fillfactor = 90);"
+    )
+
+
+@pytest.mark.parametrize(
+    "relkind, migrate_existing, expected_change",
+    [
+        ("p", False, ALREADY_PARTITIONED),
+        ("p", True, ALREADY_PARTITIONED),
+        ("r", False, NOT_MIGRATED),
+    ],
+)
+def test_provision_online_tables_leaves_existing_table(
+    relkind, migrate_existing, expected_change, cursor
+):
+    """Test existing tables are left unchanged, unless asked to migrate unpartitioned ones."""
+    # GIVEN the table of the feature view exists
+    cursor.fetchone.return_value = (relkind,)
+
+    # WHEN the tables are provisioned
+    changes = provision_online_tables(
+        **CONNECTION_PARAMS,
+        feature_views=["driver_stats"],
+        layout=LAYOUT,
+        migrate_existing=migrate_existing,
+    )
+
+    # THEN the table is left unchanged
+    assert changes == {"feast_project_driver_stats": expected_change}
+    assert len(_statements(cursor)) == 1
+
+
+def test_provision_online_tables_migrates_unpartitioned_table(cursor):
+    """Test an unpartitioned table is migrated to a partitioned one with its rows."""
+    # GIVEN the table of the feature view exists unpartitioned, with 1000 rows
+    cursor.fetchone.return_value = ("r",)
+    cursor.rowcount = 1000
+
+    # WHEN the tables are provisioned with migrate_existing
+    changes = provision_online_tables(
+        **CONNECTION_PARAMS,
+        feature_views=["driver_stats"],
+        layout=LAYOUT,
+        migrate_existing=True,
+    )
+
+    # THEN the rows are copied to the partitioned table, and the unpartitioned table dropped
+    assert changes == {"feast_project_driver_stats": "migrated 1000 rows"}
+    statements = _statements(cursor)
+    assert statements[1] == (
+        'ALTER TABLE "feast_project_driver_stats"'
+        ' RENAME TO "feast_project_driver_stats__unpartitioned";'
+    )
+    assert 'LIKE "feast_project_driver_stats__unpartitioned" INCLUDING DEFAULTS' in statements[3]
+    assert statements[-2] == (
+        'INSERT INTO "feast_project_driver_stats"'
+        ' SELECT * FROM "feast_project_driver_stats__unpartitioned";'
+    )
+    assert statements[-1] == 'DROP TABLE "feast_project_driver_stats__unpartitioned";'
+
+
+def test_provision_online_tables_with_vector_search(cursor):
+    """Test tables are created with embeddings, and an index on them, with vector search."""
+    # GIVEN the table of the feature view does not exist
+    cursor.fetchone.side_effect = [None, ("vector(768)", False)]
+
+    # WHEN the tables are provisioned with vector search enabled
+    layout = OnlineTableLayout(
+        partitions=4, fillfactor=90, vector_length=768, vector_index_type="hnsw"
+    )
+    changes = provision_online_tables(
+        **CONNECTION_PARAMS, feature_views=["documents"], layout=layout
+    )
+
+    # THEN the table is created with the embeddings column, and an hnsw index on it
+    assert changes == {"feast_project_documents": "created, hnsw vector index created"}
+    statements = _statements(cursor)
+    assert _columns(statements[1]) == [
+        column.format(vector_type="vector(768)") for column in FEAST_COLUMNS
+    ]
+    assert statements[-1] == (
+        'CREATE INDEX "feast_project_documents_vector" ON "feast_project_documents"'
+        " USING hnsw (vector_value vector_l2_ops);"
+    )
+
+
+@pytest.mark.parametrize(
+    "vector_column",
+    [("bytea", False), ("vector(768)", True)],
+)
+def test_provision_online_tables_vector_index_not_created(vector_column, cursor):
+    """Test no index is created without embeddings, or when they are already indexed."""
+    # GIVEN the table of the feature view exists partitioned
+    cursor.fetchone.side_effect = [("p",), vector_column]
+
+    # WHEN the tables are provisioned with vector search enabled
+    layout = OnlineTableLayout(
+        partitions=4, fillfactor=90, vector_length=768, vector_index_type="hnsw"
+    )
+    changes = provision_online_tables(
+        **CONNECTION_PARAMS, feature_views=["documents"], layout=layout
+    )
+
+    # THEN no index is created
+    assert changes == {"feast_project_documents": ALREADY_PARTITIONED}
+    assert len(_statements(cursor)) == 2
+
+
+def test_online_table_layout_unsupported_vector_index_type():
+    """Test only the index types of pgvector are accepted."""
+    with pytest.raises(ValueError):
+        OnlineTableLayout(partitions=4, fillfactor=90, vector_length=768, vector_index_type="gin")
+
+
+@pytest.mark.parametrize(
+    "partitions, fillfactor, invalid_field",
+    [(0, 90, "partitions"), (4, 5, "fillfactor"), (4, 101, "fillfactor")],
+)
+def test_online_table_layout_out_of_bounds(partitions, fillfactor, invalid_field):
+    """Test a number of partitions or a fillfactor out of bounds is rejected, naming it."""
+    with pytest.raises(ValueError, match=invalid_field):
+        OnlineTableLayout(partitions=partitions, fillfactor=fillfactor)
@@ -0,0 +1,47 @@
+from unittest.mock import patch
+
+import psycopg
+import pytest
+
+from role_settings import RoleSettingsError, set_role_settings
+
+CONNECTION_PARAMS = {
+    "host": "localhost",
+    "port": "5432",
+    "database": "offline_store",
+    "user": "myuser",
+    "password": "mypassword",
+}
+
+
+@pytest.fixture
+def connection():
+    """Return a mocked psycopg connection."""
+    with patch("psycopg.connect") as mock_connect:
+        yield mock_connect.return_value.__enter__.return_value
+
+
+def test_set_role_settings(connection):
+    """Test settings are set as defaults of the role in the database, and empty ones reset."""
+    # WHEN a setting with a value and an empty one are set
+    set_role_settings(**CONNECTION_PARAMS, settings={"work_mem": "256MB", "statement_timeout": ""})
+
+    # THEN the first is set and the second reset, for the current user in the database only
+    statements = [call.args[0].as_string() for call in connection.execute.call_args_list]
+    assert statements == [
+        """ALTER ROLE CURRENT_USER IN DATABASE "offline_store" SET "work_mem" = '256MB';""",
+        """ALTER ROLE CURRENT_USER IN DATABASE "offline_store" RESET "statement_timeout";""",
+    ]
+
+
+def test_set_role_settings_invalid_value(connection):
+    """Test an invalid setting raises a RoleSettingsError."""
+    # GIVEN the database rejects the value of the setting
+    connection.execute.side_effect = psycopg.errors.InvalidParameterValue(
+        'invalid value for parameter "work_mem": "lots"'
+    )
+
+    # WHEN the setting is set
+    # THEN a RoleSettingsError is raised
+    with pytest.raises(RoleSettingsError, match='invalid value for parameter "work_mem"'):
+        set_role_settings(**CONNECTION_PARAMS, settings={"work_mem": "lots"})
@@ -0,0 +1,27 @@
+import pytest
+
+from store_benchmark import StoreLatency, percentile
+
+
+@pytest.mark.parametrize(
+    "p, expected",
+    [(50, 5), (95, 10), (99, 10), (10, 1), (0, 1)],
+)
+def test_percentile(p, expected):
+    """Test percentiles are computed with the nearest-rank method."""
+    assert percentile([10, 1, 9, 2, 8, 3, 7, 4, 6, 5], p) == expected
+
+
+def test_store_latency_to_action_results():
+    """Test the latencies are reported in milliseconds."""
+    latency = StoreLatency(connect=[0.002, 0.001, 0.004], query=[0.0005, 0.0005, 0.0005])
+
+    assert latency.to_action_results() == {
+        "rounds": "3",
+        "connect-p50-ms": "2.00",
+        "connect-p95-ms": "4.00",
+        "connect-p99-ms": "4.00",
+        "query-p50-ms": "0.50",
+        "query-p95-ms": "0.50",
+        "query-p99-ms": "0.50",
+    }
@@ -0,0 +1,786 @@
+"""Library for sharing Feast store configuration information.
+
+This library offers a Python API for providing and requesting information about
+Feast feature store configuration.
+The default relation name is `feast-configuration` and it's recommended to use that name,
+though if changed, you must ensure to pass the correct name when instantiating the
+provider and requirer classes, as well as in `metadata.yaml`.
+
+## Getting Started
+
+### Fetching the library with charmcraft
+
+Using charmcraft you can:
+```shell
+charmcraft fetch-lib charms.feast_integrator.v1.feast_store_configuration
+```
+
+## Using the library as requirer
+
+### Add relation to metadata.yaml
+```yaml
+requires:
+  feast-configuration:
+    interface: feast-configuration
+    limit: 1
+```
+
+### Instantiate the  class in charm.py
+
+```python
+from ops.charm import CharmBase
+from charms.feast_integrator.v1.feast_store_configuration import (
+    FeastStoreConfigurationRequirer,
+    FeastStoreConfigurationRelationError
+)
+
+class RequirerCharm(CharmBase):
+    def __init__(self, *args):
+        self.feast_configuration_requirer = FeastStoreConfigurationRequirer(self)
+        self.framework.observe(
+            self.feast_configuration_requirer.on.updated, self.some_event_function
+        )
+
+    def some_event_function():
+        # use the getter function wherever the info is needed
+        try:
+            feast_configuration_yaml = self.feast_configuration_requirer.get_feature_store_yaml()
+        except FeastStoreConfigurationRelationError as error:
+            "your error handler goes here"
+        except FeastStoreConfigurationDataInvalidError as error:
+            "your error handler goes here"
+```
+
+The `updated` event is emitted when the relation changes or is broken, and when a new revision
+of the credentials secret is published.
+
+## Using the library as provider
+
+### Add relation to metadata.yaml
+
+```yaml
+provides:
+  feast-configuration:
+    interface: feast-configuration
+    limit: 1
+```
+
+### Instantiate the  class in charm.py
+
+```python
+from ops.charm import CharmBase
+from charms.feast_integrator.v1.feast_store_configuration import (
+FeastStoreConfigurationProvider,
+FeastStoreConfigurationRelationMissingError
+)
+
+class ProviderCharm(CharmBase):
+    def __init__(self, *args, **kwargs):
+        ...
+        self.feast_configuration_provider = FeastStoreConfigurationProvider(self)
+        self.observe(self.on.some_event, self._some_event_handler)
+
+    def _some_event_handler(self, ...):
+        # Create the FeastStoreConfiguration object
+        try:
+            store_config = FeastStoreConfiguration(
+                registry_user="my_user",
+                registry_password="pass",
+                registry_host="host",
+                registry_port=5432,
+                registry_database="reg_db",
+                offline_store_host="offline_host",
+                offline_store_port=3306,
+                offline_store_database="offline_db",
+                offline_store_user="off_user",
+                offline_store_password="off_pass",
+                online_store_host="online_host",
+                online_store_port=6379,
+                online_store_database="online_db",
+                online_store_user="on_user",
+                online_store_password="on_pass"
+            )
+        except FeastStoreConfigurationDataInvalidError as e:
+            "your error handler goes here"
+
+        try:
+            self.feast_configuration_provider.send_data(store_config)
+        except FeastStoreConfigurationRelationMissingError as error:
+            "your error handler goes here"
+```
+
+## Relation data
+
+The data shared by this library is defined by the FeastStoreConfiguration dataclass. The provider
+application shares it in its application data bag as:
+
+* `config`: a JSON object with the format `version` and, for each of `registry`, `offline_store`
+  and `online_store`, its `host`, `port` and `database`, as well as the `entity_select_mode` of
+  the `offline_store`
+* `credentials`: the URI of a Juju secret, granted to the relation, holding the user and password
+  of each store as `<store>-user` and `<store>-password`, e.g. `offline-store-password`
+* `revision`: a random token, also held in the secret as `revision`, which is replaced whenever
+  the credentials change
+* `config_hash`: a digest of the config and the revision, which changes whenever either does
+
+Requirers can detect any change of the configuration, credentials included, by comparing
+`config_hash` only. They can tell whether the revision of the secret they track holds the current
+credentials by comparing its `revision` with the one of the data bag. The credentials are only
+read from the secret once for each value of `revision`. The token is random, and `config_hash`
+covers the token rather than the credentials, so that the data bag discloses nothing about the
+credentials.
+
+## Upgrades
+
+The requirer advertises the major version of this library it reads as `lib_api` in its
+application data bag. The provider shares the data bag of v0 of this library, where each attribute
+of FeastStoreConfiguration but `offline_store_entity_select_mode` is a key of the data bag,
+credentials included, with requirers that do not advertise it. Requirers still using v0 thus keep
+working when the provider is refreshed first. Once they advertise v1, the provider removes the
+keys of v0 from the data bag.
+
+For compatibility while the provider is refreshed, the requirer also accepts the data bag of v0.
+"""
+
+# The unique Charmhub library identifier, never change it
+import hashlib
+import json
+import logging
+import secrets
+from dataclasses import MISSING, dataclass, fields
+from typing import Dict, Optional, Tuple
+
+import yaml
+from ops import (
+    BoundEvent,
+    CharmBase,
+    EventSource,
+    ModelError,
+    Object,
+    ObjectEvents,
+    Relation,
+    RelationEvent,
+    Secret,
+    SecretChangedEvent,
+    SecretNotFoundError,
+    StoredState,
+)
+
+logger = logging.getLogger(__name__)
+
+LIBID = "811da8ece74c4c09b53e114cb74d591e"
+
+# Increment this major API version when introducing breaking changes
+LIBAPI = 1
+
+# Increment this PATCH version before using `charmcraft publish-lib` or reset
+# to 0 if you are raising the major API version
+LIBPATCH = 1
+
+DEFAULT_RELATION_NAME = "feast-configuration"
+
+CONFIG_FIELD = "config"
+CONFIG_HASH_FIELD = "config_hash"
+CREDENTIALS_FIELD = "credentials"
+LIB_API_FIELD = "lib_api"
+REVISION_FIELD = "revision"
+CONFIG_FORMAT_VERSION = 1
+
+STORES = ("registry", "offline_store", "online_store")
+CONNECTION_ATTRIBUTES = ("host", "port", "database")
+CREDENTIALS_ATTRIBUTES = ("user", "password")
+ENTITY_SELECT_MODES = ("temp_table", "embed_query")
+
+
+class FeastStoreConfigurationUpdatedEvent(RelationEvent):
+    """Indicates the Feast Store Configuration data was updated."""
+
+
+class FeastStoreConfigurationEvents(ObjectEvents):
+    """Events for the Feast Store Configuration library."""
+
+    updated = EventSource(FeastStoreConfigurationUpdatedEvent)
+
+
+class FeastStoreConfigurationRelationError(Exception):
+    """Base exception class for any relation error handled by this library."""
+
+    pass
+
+
+class FeastStoreConfigurationRelationMissingError(FeastStoreConfigurationRelationError):
+    """Exception to raise when the relation is missing on either end."""
+
+    def __init__(self, relation_name):
+        self.message = (
+            f"Missing relation with name {relation_name} with a store configuration provider."
+        )
+        super().__init__(self.message)
+
+
+class FeastStoreConfigurationRelationDataMissingError(FeastStoreConfigurationRelationError):
+    """Exception to raise when there is missing data in the relation data bag."""
+
+    def __init__(self, relation_name):
+        self.message = f"No data found in relation {relation_name} data bag."
+        super().__init__(self.message)
+
+
+class FeastStoreConfigurationCredentialsError(FeastStoreConfigurationRelationError):
+    """Exception to raise when the credentials secret cannot be read (yet)."""
+
+    def __init__(self, secret_uri, error):
+        self.message = f"Cannot read credentials secret {secret_uri}: {error}"
+        super().__init__(self.message)
+
+
+class FeastStoreConfigurationDataInvalidError(Exception):
+    """Exception to raise when the data in the relation data bag has incorrect format."""
+
+    def __init__(self, error):
+        self.message = f"Data format for FeastStoreConfiguration has incorrect format: {error}."
+        super().__init__(self.message)
+
+
+@dataclass
+class FeastStoreConfiguration:
+    """Configuration parameters for generating a Feast feature store.
+
+    This dataclass captures all dynamic, parameterizable values used in the
+    Feast store configuration template. These values are typically substituted into
+    the YAML template at runtime or during deployment to configure connections
+    to the registry, online store, and offline store.
+
+    Attributes:
+        registry_user (str): Username for connecting to the registry database.
+        registry_password (str): Password for the registry user.
+        registry_host (str): Hostname or IP address of the registry database.
+        registry_port (int): Port number for the registry database.
+        registry_database (str): Name of the registry database.
+
+        offline_store_host (str): Hostname or IP for the offline store database.
+        offline_store_port (int): Port number for the offline store.
+        offline_store_database (str): Database name for the offline store.
+        offline_store_user (str): Username for the offline store.
+        offline_store_password (str): Password for the offline store user.
+
+        online_store_host (str): Hostname or IP for the online store database.
+        online_store_port (int): Port number for the online store.
+        online_store_database (str): Database name for the online store.
+        online_store_user (str): Username for the online store.
+        online_store_password (str): Password for the online store user.
+
+        offline_store_entity_select_mode (str): How the offline store joins entity dataframes,
+            `temp_table` (default) or `embed_query`.
+    """
+
+    # Registry configuration
+    registry_user: str
+    registry_password: str
+    registry_host: str
+    registry_port: int
+    registry_database: str
+
+    # Offline store configuration
+    offline_store_host: str
+    offline_store_port: int
+    offline_store_database: str
+    offline_store_user: str
+    offline_store_password: str
+
+    # Online store configuration
+    online_store_host: str
+    online_store_port: int
+    online_store_database: str
+    online_store_user: str
+    online_store_password: str
+
+    # Offline store options
+    offline_store_entity_select_mode: str = "temp_table"
+
+    def __post_init__(self):
+        for field_name, expected_type in _FIELD_TYPES.items():
+            value = getattr(self, field_name)
+
+            # Convert str to int where expected
+            if expected_type is int:
+                if isinstance(value, str):
+                    try:
+                        value = int(value)
+                        setattr(self, field_name, value)
+                    except ValueError:
+                        raise FeastStoreConfigurationDataInvalidError(
+                            f"{field_name} must be int or string representing an int, got :{value}"
+                        )
+
+            # Final strict type check after any conversion
+            if not isinstance(value, expected_type):
+                raise FeastStoreConfigurationDataInvalidError(
+                    f"{field_name} must be of type {expected_type.__name__}, "
+                    f"got {type(value).__name__}"
+                )
+
+        if self.offline_store_entity_select_mode not in ENTITY_SELECT_MODES:
+            raise FeastStoreConfigurationDataInvalidError(
+                f"offline_store_entity_select_mode must be one of {', '.join(ENTITY_SELECT_MODES)}"
+                f", got {self.offline_store_entity_select_mode}"
+            )
+
+    def to_relation_data(self) -> Tuple[Dict, Dict[str, str]]:
+        """Return the config and the credentials secret content shared over the relation."""
+        config: Dict = {"version": CONFIG_FORMAT_VERSION}
+        credentials = {}
+        for store in STORES:
+            config[store] = {
+                attribute: getattr(self, f"{store}_{attribute}")
+                for attribute in CONNECTION_ATTRIBUTES
+            }
+            for attribute in CREDENTIALS_ATTRIBUTES:
+                credentials[_credentials_key(store, attribute)] = getattr(
+                    self, f"{store}_{attribute}"
+                )
+        config["offline_store"]["entity_select_mode"] = self.offline_store_entity_select_mode
+        return config, credentials
+
+    @classmethod
+    def from_relation_data(
+        cls, config: Dict, credentials: Dict[str, str]
+    ) -> "FeastStoreConfiguration":
+        """Create a FeastStoreConfiguration from the config and credentials of the relation.
+
+        Raises:
+            FeastStoreConfigurationDataInvalidError: if the data has an incorrect format.
+        """
+        if not isinstance(config, dict) or config.get("version") != CONFIG_FORMAT_VERSION:
+            raise FeastStoreConfigurationDataInvalidError(
+                f"unsupported config version in {config}"
+            )
+        try:
+            attributes = {
+                f"{store}_{attribute}": config[store][attribute]
+                for store in STORES
+                for attribute in CONNECTION_ATTRIBUTES
+            }
+            attributes.update(
+                {
+                    f"{store}_{attribute}": credentials[_credentials_key(store, attribute)]
+                    for store in STORES
+                    for attribute in CREDENTIALS_ATTRIBUTES
+                }
+            )
+            attributes["offline_store_entity_select_mode"] = config["offline_store"][
+                "entity_select_mode"
+            ]
+        except (KeyError, TypeError) as e:
+            raise FeastStoreConfigurationDataInvalidError(f"missing {e}")
+        return cls(**attributes)
+
+
+# The type of each attribute of FeastStoreConfiguration, checked in __post_init__
+_FIELD_TYPES: Dict[str, type] = {
+    field.name: field.type for field in fields(FeastStoreConfiguration)
+}
+# The attributes of FeastStoreConfiguration that are keys of the data bag of v0 of this library
+_V0_FIELDS = tuple(
+    field.name for field in fields(FeastStoreConfiguration) if field.default is MISSING
+)
+
+
+def compute_config_hash(config: Dict, revision: str) -> str:
+    """Return the hash shared with the config, covering the config and the credentials revision."""
+    serialized = json.dumps(
+        {CONFIG_FIELD: config, REVISION_FIELD: revision}, separators=(",", ":"), sort_keys=True
+    )
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def _credentials_key(store: str, attribute: str) -> str:
+    # Juju secret keys only allow lowercase letters, digits and hyphens
+    return f"{store}-{attribute}".replace("_", "-")
+
+
+class FeastStoreConfigurationProvider(Object):
+    """Implement the Provider end of the Feast Configuration relation.
+
+    The credentials of the stores are shared in a Juju secret owned by the provider application,
+    one per relation, which is removed when the relation is broken.
+
+    Attributes:
+        charm (CharmBase): the requirer application
+        relation_name (str, optional): the name of the relation
+    """
+
+    on = FeastStoreConfigurationEvents()
+
+    def __init__(
+        self,
+        charm: CharmBase,
+        relation_name: Optional[str] = DEFAULT_RELATION_NAME,
+    ):
+        super().__init__(charm, relation_name)
+        self.charm = charm
+        self.relation_name = relation_name
+        # the store configuration sent, or found already shared, during this dispatch
+        self._sent_data: Optional[FeastStoreConfiguration] = None
+
+        self.framework.observe(
+            self.charm.on[self.relation_name].relation_broken, self._on_relation_broken
+        )
+
+    def send_data(self, store_configuration: FeastStoreConfiguration):
+        """Update the relation data bag with data from a Store Configuration.
+
+        Nothing is written when the relation already holds the same configuration and its
+        credentials secret still exists. This is checked once per dispatch. Requirers that do not
+        advertise v1 of this library are sent the data bag of v0.
+
+        Args:
+            store_configuration (StoreConfiguration): the Feast store configuration object
+        """
+        # Validate unit is leader to send data; otherwise return
+        if not self.charm.model.unit.is_leader():
+            logger.info(
+                "StoreConfigurationProivder handled send_data event when it is not the leader."
+                "Skipping event - no data sent."
+            )
+            return
+
+        relation = self.model.get_relation(self.relation_name)
+
+        if not relation:
+            raise FeastStoreConfigurationRelationMissingError(self.relation_name)
+
+        if self._sent_data == store_configuration:
+            logger.debug("Store configuration already sent, skipping sending data.")
+            return
+
+        if not self._requirer_reads_v1(relation):
+            self._send_v0_data(relation, store_configuration)
+            self._sent_data = store_configuration
+            return
+
+        config, credentials = store_configuration.to_relation_data()
+        relation_data = relation.data[self.charm.app]
+        revision = relation_data.get(REVISION_FIELD)
+        secret = self._get_credentials_secret(relation)
+        if secret is None or not self._holds_credentials(secret, credentials, revision):
+            revision = secrets.token_hex(16)
+            secret = self._set_credentials_secret(
+                relation, secret, {**credentials, REVISION_FIELD: revision}
+            )
+
+        # Update relation data, the unchanged fields are not written again
+        logger.debug(f"Sending config {config} with revision {revision}")
+        relation_data.update(
+            {
+                CONFIG_FIELD: json.dumps(config, sort_keys=True),
+                CONFIG_HASH_FIELD: compute_config_hash(config, revision),
+                CREDENTIALS_FIELD: secret.id or secret.get_info().id,
+                REVISION_FIELD: revision,
+            }
+        )
+        for field_name in _V0_FIELDS:
+            relation_data.pop(field_name, None)
+        self._sent_data = store_configuration
+
+    @staticmethod
+    def _requirer_reads_v1(relation: Relation) -> bool:
+        """Return whether the requirer advertises that it reads the data bag of v1."""
+        return relation.app is not None and LIB_API_FIELD in relation.data[relation.app]
+
+    def _send_v0_data(self, relation: Relation, store_configuration: FeastStoreConfiguration):
+        """Share the store configuration in the data bag of v0, credentials included."""
+        logger.warning(
+            f"The requirer of relation {relation.id} does not read v1 of the store configuration,"
+            " sharing it, credentials included, in the data bag of v0."
+        )
+        relation_data = relation.data[self.charm.app]
+        relation_data.update(
+            {
+                field_name: str(getattr(store_configuration, field_name))
+                for field_name in _V0_FIELDS
+            }
+        )
+        for field in (CONFIG_FIELD, CONFIG_HASH_FIELD, CREDENTIALS_FIELD, REVISION_FIELD):
+            relation_data.pop(field, None)
+
+    @staticmethod
+    def _holds_credentials(
+        secret: Secret, credentials: Dict[str, str], revision: Optional[str]
+    ) -> bool:
+        """Return whether the secret holds the credentials with the revision of the data bag.
+
+        The tracked revision of the secret is read first, and the latest one only if it differs.
+        """
+        content = {**credentials, REVISION_FIELD: revision}
+        return secret.get_content() == content or secret.get_content(refresh=True) == content
+
+    def _get_credentials_secret(self, relation: Relation) -> Optional[Secret]:
+        """Return the credentials secret of the relation, or None if it does not exist."""
+        try:
+            return self.charm.model.get_secret(
+                id=relation.data[self.charm.app].get(CREDENTIALS_FIELD),
+                label=self._credentials_secret_label(relation),
+            )
+        except SecretNotFoundError:
+            return None
+
+    def _set_credentials_secret(
+        self, relation: Relation, secret: Optional[Secret], content: Dict[str, str]
+    ) -> Secret:
+        """Set the content of the credentials secret of the relation, creating it if needed."""
+        if secret is None:
+            logger.info(f"Creating the credentials secret of relation {relation.id}.")
+            secret = self.charm.app.add_secret(
+                content,
+                label=self._credentials_secret_label(relation),
+                description=f"Feast store credentials for relation {relation.id}",
+            )
+            secret.grant(relation)
+            return secret
+
+        secret.set_content(content)
+        return secret
+
+    def _on_relation_broken(self, event: BoundEvent) -> None:
+        """Remove the credentials secret of the broken relation."""
+        if not self.charm.model.unit.is_leader():
+            return
+        try:
+            secret = self.charm.model.get_secret(
+                label=self._credentials_secret_label(event.relation)
+            )
+        except SecretNotFoundError:
+            return
+        secret.remove_all_revisions()
+
+    def _credentials_secret_label(self, relation: Relation) -> str:
+        return f"{self.relation_name}-{relation.id}-credentials"
+
+
+class FeastStoreConfigurationRequirer(Object):
+    """Implement the Requirer end of the Feast Configuration relation.
+
+    Attributes:
+        charm (CharmBase): the requirer application
+        relation_name (str, optional): the name of the relation
+    """
+
+    on = FeastStoreConfigurationEvents()
+    _stored = StoredState()
+
+    def __init__(self, charm: CharmBase, relation_name: Optional[str] = DEFAULT_RELATION_NAME):
+        super().__init__(charm, relation_name)
+        self.charm = charm
+        self.relation_name = relation_name
+        # credentials read from the secret, by revision
+        self._credentials: Dict[str, Dict[str, str]] = {}
+        # the digest of the data of the provider application, and the feature_store.yaml rendered
+        # from it during this dispatch, never stored as it holds the credentials
+        self._feature_store_yaml: Optional[Tuple[str, str]] = None
+        # the digest of the data of the provider application when updated was last emitted
+        self._stored.set_default(updated_data_digest=None)
+
+        self.framework.observe(
+            self.charm.on[self.relation_name].relation_changed, self._on_relation_changed
+        )
+
+        self.framework.observe(
+            self.charm.on[self.relation_name].relation_broken, self._on_relation_broken
+        )
+
+        self.framework.observe(self.charm.on.secret_changed, self._on_secret_changed)
+
+        # The data bag format read by this library is advertised once the relation exists, and
+        # again after a refresh or a change of leader
+        self.framework.observe(
+            self.charm.on[self.relation_name].relation_created, self._advertise_lib_api
+        )
+        self.framework.observe(self.charm.on.upgrade_charm, self._advertise_lib_api)
+        self.framework.observe(self.charm.on.leader_elected, self._advertise_lib_api)
+
+    def _advertise_lib_api(self, _) -> None:
+        """Advertise the major version of this library to the provider, as the leader."""
+        if not self.charm.unit.is_leader():
+            return
+        relation = self.model.get_relation(self.relation_name)
+        if relation:
+            relation.data[self.charm.app][LIB_API_FIELD] = str(LIBAPI)
+
+    def _on_relation_changed(self, event: BoundEvent) -> None:
+        """Handle relation-changed event for this relation.
+
+        The updated event is only emitted when the data bag of the provider application changed,
+        and not for changes to the data bags of its units, which carry no configuration.
+        """
+        data_digest = self._get_app_data_digest(event.relation)
+        if data_digest == self._stored.updated_data_digest:
+            logger.debug("Store configuration unchanged, not emitting updated.")
+            return
+        self._stored.updated_data_digest = data_digest
+        self.on.updated.emit(event.relation)
+
+    def _on_relation_broken(self, event: BoundEvent) -> None:
+        """Handle relation-broken event for this relation."""
+        self._stored.updated_data_digest = None
+        self.on.updated.emit(event.relation)
+
+    def _on_secret_changed(self, event: SecretChangedEvent) -> None:
+        """Handle secret-changed event for the credentials secret of this relation."""
+        relation = self.model.get_relation(self.relation_name)
+        if relation and event.secret.label == self._credentials_secret_label(relation):
+            self.on.updated.emit(relation)
+
+    def get_config_hash(self) -> Optional[str]:
+        """Return the hash of the configuration shared by the provider, if any.
+
+        The hash changes whenever the configuration or the credentials change.
+        """
+        relation = self.model.get_relation(self.relation_name)
+        if not relation or not relation.app:
+            return None
+        return relation.data[relation.app].get(CONFIG_HASH_FIELD)
+
+    def get_store_configuration(self) -> FeastStoreConfiguration:
+        """Return the store configuration shared by the provider.
+
+        Raises:
+            FeastStoreConfigurationRelationMissingError: if there is no related application
+            FeastStoreConfigurationRelationDataMissingError: if data is missing
+            FeastStoreConfigurationCredentialsError: if the credentials cannot be read yet
+            FeastStoreConfigurationDataInvalidError: if the data has an incorrect format
+        """
+        relation = self.model.get_relation(self.relation_name)
+
+        if not relation:
+            raise FeastStoreConfigurationRelationMissingError(self.relation_name)
+
+        relation_data = relation.data[relation.app]
+
+        if not relation_data:
+            raise FeastStoreConfigurationRelationDataMissingError(self.relation_name)
+
+        if CONFIG_FIELD not in relation_data:
+            return self._get_v0_store_configuration(relation_data)
+
+        try:
+            config = json.loads(relation_data[CONFIG_FIELD])
+            secret_uri = relation_data[CREDENTIALS_FIELD]
+            revision = relation_data[REVISION_FIELD]
+        except (KeyError, json.JSONDecodeError) as e:
+            raise FeastStoreConfigurationDataInvalidError(e)
+
+        credentials = self._get_credentials(relation, secret_uri, revision)
+        return FeastStoreConfiguration.from_relation_data(config, credentials)
+
+    def _get_credentials(
+        self, relation: Relation, secret_uri: str, revision: str
+    ) -> Dict[str, str]:
+        """Return the credentials in the secret, reading it only once per revision.
+
+        The tracked revision of the secret is read first, and the latest revision is only
+        fetched when the tracked one does not hold the revision of the data bag, i.e. when the
+        credentials were rotated and secret-changed has not been handled yet.
+        """
+        if revision not in self._credentials:
+            try:
+                secret = self.charm.model.get_secret(
+                    id=secret_uri, label=self._credentials_secret_label(relation)
+                )
+                credentials = secret.get_content()
+                if credentials.get(REVISION_FIELD) != revision:
+                    credentials = secret.get_content(refresh=True)
+            except (SecretNotFoundError, ModelError) as e:
+                raise FeastStoreConfigurationCredentialsError(secret_uri, e)
+            self._credentials = {revision: credentials}
+        return self._credentials[revision]
+
+    def _get_v0_store_configuration(self, relation_data) -> FeastStoreConfiguration:
+        """Return the store configuration from a data bag in the format of v0 of this library."""
+        if not set(_V0_FIELDS) <= set(relation_data):
+            raise FeastStoreConfigurationRelationDataMissingError(self.relation_name)
+        logger.info("Reading store configuration shared in the format of v0 of this library.")
+        try:
+            return FeastStoreConfiguration(**relation_data)
+        except TypeError as e:
+            raise FeastStoreConfigurationDataInvalidError(e)
+
+    def _credentials_secret_label(self, relation: Relation) -> str:
+        return f"{self.relation_name}-{relation.id}-credentials"
+
+    def _get_app_data_digest(self, relation: Optional[Relation] = None) -> Optional[str]:
+        """Return a digest of the data bag of the provider application, if related."""
+        relation = relation or self.model.get_relation(self.relation_name)
+        if not relation or not relation.app:
+            return None
+        serialized = json.dumps(dict(relation.data[relation.app]), sort_keys=True)
+        return hashlib.sha256(serialized.encode()).hexdigest()
+
+    def get_feature_store_yaml(self):
+        """Generate the Feast feature_store.yaml content from the relation data.
+
+        The rendered file is kept in memory with a digest of the data bag of the provider, so
+        that it is only rendered once per dispatch for the same data. It is not kept in stored
+        state, as it holds the credentials of the stores.
+
+        Returns:
+            str: A string representation of the feature_store.yaml file.
+
+        Raises:
+            FeastStoreConfigurationRelationMissingError: if there is no related application
+            FeastStoreConfigurationRelationDataMissingError: if data is missing
+            FeastStoreConfigurationCredentialsError: if the credentials cannot be read yet
+            FeastStoreConfigurationDataInvalidError: if the data has an incorrect format
+        """
+        data_digest = self._get_app_data_digest()
+        if data_digest and self._feature_store_yaml and self._feature_store_yaml[0] == data_digest:
+            return self._feature_store_yaml[1]
+
+        try:
+            config = self.get_store_configuration()
+        except FeastStoreConfigurationDataInvalidError as e:
+            raise FeastStoreConfigurationDataInvalidError(
+                f"Failed to create FeastStoreConfiguration: {e.message}"
+            )
+
+        yaml_dict: Dict = {
+            "project": "feast_project",
+            "registry": {
+                "registry_type": "sql",
+                "path": (
+                    f"postgresql://{config.registry_user}:{config.registry_password}"
+                    f"@{config.registry_host}:{config.registry_port}/{config.registry_database}"
+                ),
+                "cache_ttl_seconds": 60,
+                "sqlalchemy_config_kwargs": {
+                    "echo": False,
+                    "pool_pre_ping": True,
+                },
+            },
+            "provider": "local",
+            "offline_store": {
+                "type": "postgres",
+                "host": config.offline_store_host,
+                "port": config.offline_store_port,
+                "database": config.offline_store_database,
+                "db_schema": "public",
+                "user": config.offline_store_user,
+                "password": config.offline_store_password,
+                "entity_select_mode": config.offline_store_entity_select_mode,
+            },
+            "online_store": {
+                "type": "postgres",
+                "host": config.online_store_host,
+                "port": config.online_store_port,
+                "database": config.online_store_database,
+                "db_schema": "public",
+                "user": config.online_store_user,
+                "password": config.online_store_password,
+            },
+            "entity_key_serialization_version": 2,
+        }
+
+        feature_store_yaml = yaml.dump(yaml_dict, sort_keys=False)
+        if data_digest:
+            self._feature_store_yaml = (data_digest, feature_store_yaml)
+        return feature_store_yaml
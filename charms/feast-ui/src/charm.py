@@ -6,14 +6,16 @@
 
 import logging
 import tempfile
+from functools import cached_property
+from pathlib import Path
 from typing import List
 
 import ops
+import yaml
 from charmed_kubeflow_chisme.components import (
     ContainerFileTemplate,
     SdiRelationBroadcasterComponent,
 )
-from charmed_kubeflow_chisme.components.charm_reconciler import CharmReconciler
 from charmed_kubeflow_chisme.components.leadership_gate_component import (
     LeadershipGateComponent,
 )
@@ -22,14 +24,17 @@ from charms.kubeflow_dashboard.v0.kubeflow_dashboard_links import (
     DashboardLink,
     KubeflowDashboardLinksRequirer,
 )
+from lightkube import Client
 from ops import CharmBase, WaitingStatus
 
 from components.istio_ambient_requirer_component import AmbientIngressRequirerComponent
 from components.istio_relations_conflict_detector import IstioRelationsConflictDetectorComponent
+from components.kubernetes_resources_patch_component import KubernetesResourcesPatchComponent
 from components.pebble_component import FeastUIPebbleService
 from components.store_configuration_reciver_component import (
     StoreConfigurationReceiverComponent,
 )
+from instrumented_charm_reconciler import InstrumentedCharmReconciler
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +49,11 @@ INGRESS_PATH_MATCHED_PREFIX = "/feast/"
 INGRESS_PATH_REWRITTEN_PREFIX = "/"
 K8S_SERVICE_HTTP_PORT = APPLICATION_PORT
 PEBBLE_SERVICE_NAME = CONTAINER_NAME
+REGISTRY_SNAPSHOT_DEST_PATH = "/var/lib/feast/registry-snapshot/registry.db"
+REGISTRY_SNAPSHOT_FS_YAML_DEST_PATH = "/home/ubuntu/feature_store_snapshot.yaml"
+REGISTRY_SNAPSHOT_SCRIPT_DEST_PATH = "/home/ubuntu/registry_snapshot.py"
+REGISTRY_SNAPSHOT_SCRIPT_FILE_PATH = Path("src/templates/registry_snapshot.py")
+REGISTRY_SNAPSHOT_STORAGE_NAME = "registry-snapshot"
 RELATION_NAME = "feast-configuration"
 
 DASHBOARD_LINKS = [
@@ -63,7 +73,8 @@ class FeastUICharm(CharmBase):
     def __init__(self, framework: ops.Framework):
         super().__init__(framework)
 
-        # add links in kubeflow-dashboard sidebar
+        # add links in kubeflow-dashboard sidebar; the links are written with
+        # RelationDataContent.update, so unchanged links do not call relation-set
         self.kubeflow_dashboard_sidebar = KubeflowDashboardLinksRequirer(
             charm=self,
             relation_name="dashboard-links",
@@ -72,7 +83,21 @@ class FeastUICharm(CharmBase):
 
         self.unit.set_ports(ops.Port("tcp", APPLICATION_PORT))
 
-        self.charm_reconciler = CharmReconciler(self)
+        self.tracing = ops.tracing.Tracing(self, tracing_relation_name="charm-tracing")
+
+        self.charm_reconciler = InstrumentedCharmReconciler(self)
+
+        # Container resources, added first so the applied values are reported in the unit status
+        # when all components are active; patching itself only happens on the leader
+        self.kubernetes_resources_patch = self.charm_reconciler.add(
+            component=KubernetesResourcesPatchComponent(
+                charm=self,
+                name="workload-resources",
+                container_name=CONTAINER_NAME,
+                lightkube_client_getter=lambda: self.lightkube_client,
+            ),
+            depends_on=[],
+        )
 
         # Leadership gate
         self.leadership_gate = self.charm_reconciler.add(
@@ -99,6 +124,7 @@ class FeastUICharm(CharmBase):
                 relation_name=INGRESS_MODES_TO_RELATION_NAMES["ambient"],
                 service_name=self._ingress_target_k8s_service_name,
                 service_port=K8S_SERVICE_HTTP_PORT,
+                lightkube_client_getter=lambda: self.lightkube_client,
             ),
             depends_on=[self.leadership_gate, self.istio_relations_conflict_detector],
         )
@@ -134,6 +160,12 @@ class FeastUICharm(CharmBase):
                 container_name=CONTAINER_NAME,
                 service_name=PEBBLE_SERVICE_NAME,
                 files_to_push=self._generate_feature_store_file(),
+                feature_store_yaml_path=DEST_PATH,
+                registry_snapshot_feature_store_yaml_path=REGISTRY_SNAPSHOT_FS_YAML_DEST_PATH,
+                registry_snapshot_path=REGISTRY_SNAPSHOT_DEST_PATH,
+                registry_snapshot_refresh_interval=self._registry_snapshot_refresh_interval,
+                registry_snapshot_script_path=REGISTRY_SNAPSHOT_SCRIPT_DEST_PATH,
+                registry_snapshot_storage_name=REGISTRY_SNAPSHOT_STORAGE_NAME,
             ),
             depends_on=[self.leadership_gate, self.store_configuration_receiver],
         )
@@ -153,11 +185,57 @@ class FeastUICharm(CharmBase):
             self.unit.status = WaitingStatus("feature_store.yaml is missing or empty")
             return []
 
+        files = [
+            ContainerFileTemplate(
+                source_template_path=self._write_temporary_file(yaml_data),
+                destination_path=DEST_PATH,
+            )
+        ]
+
+        if self._registry_snapshot_refresh_interval > 0:
+            files.extend(self._generate_registry_snapshot_files(yaml_data))
+
+        return files
+
+    def _generate_registry_snapshot_files(self, yaml_data: str) -> List[ContainerFileTemplate]:
+        """Generate the files needed to warm-start the UI from a registry snapshot.
+
+        The snapshot feature_store.yaml is the one received over the relation, with the registry
+        replaced by a file registry pointing at the snapshot on the registry-snapshot storage.
+        """
+        feature_store = yaml.safe_load(yaml_data)
+        feature_store["registry"] = {
+            "registry_type": "file",
+            "path": REGISTRY_SNAPSHOT_DEST_PATH,
+            "cache_ttl_seconds": self._registry_snapshot_refresh_interval,
+        }
+        snapshot_yaml_data = yaml.dump(feature_store, sort_keys=False)
+
+        return [
+            ContainerFileTemplate(
+                source_template_path=self._write_temporary_file(snapshot_yaml_data),
+                destination_path=REGISTRY_SNAPSHOT_FS_YAML_DEST_PATH,
+            ),
+            ContainerFileTemplate(
+                source_template_path=REGISTRY_SNAPSHOT_SCRIPT_FILE_PATH,
+                destination_path=REGISTRY_SNAPSHOT_SCRIPT_DEST_PATH,
+            ),
+        ]
+
+    @staticmethod
+    def _write_temporary_file(data: str) -> str:
         with tempfile.NamedTemporaryFile(delete=False, mode="w", suffix=".yaml") as f:
-            f.write(yaml_data)
-            path = f.name
+            f.write(data)
+            return f.name
+
+    @property
+    def _registry_snapshot_refresh_interval(self) -> int:
+        return int(self.model.config["registry-snapshot-refresh-interval"])
 
-        return [ContainerFileTemplate(source_template_path=path, destination_path=DEST_PATH)]
+    @cached_property
+    def lightkube_client(self) -> Client:
+        """Return the lightkube Client shared by all the components of this charm."""
+        return Client(namespace=self.model.name, field_manager=self.app.name)
 
     @property
     def _ingress_target_k8s_service_name(self) -> str:
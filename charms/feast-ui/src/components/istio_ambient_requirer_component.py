@@ -2,32 +2,29 @@
 
 """Component to manage the required relations to Istio when in ambient mode."""
 
+import os
 from logging import getLogger
+from typing import Callable, List
 
 from charmed_kubeflow_chisme.components import Component
 from charmed_kubeflow_chisme.exceptions import GenericCharmRuntimeError
-from charms.istio_beacon_k8s.v0.service_mesh import ServiceMeshConsumer
-from charms.istio_ingress_k8s.v0.istio_ingress_route import (
-    BackendRef,
-    HTTPPathMatch,
-    HTTPRoute,
-    HTTPRouteMatch,
-    IstioIngressRouteConfig,
-    IstioIngressRouteRequirer,
-    Listener,
-    PathModifier,
-    PathModifierType,
-    ProtocolType,
-    URLRewriteFilter,
-    URLRewriteSpec,
-)
+from lightkube import Client
 from ops import ActiveStatus
 
 logger = getLogger(__name__)
 
+# relations used by ServiceMeshConsumer, with its default names
+SERVICE_MESH_RELATION_NAMES = ["service-mesh", "require-cmr-mesh", "provide-cmr-mesh"]
+
 
 class AmbientIngressRequirerComponent(Component):
-    """Component to manage the required relations to Istio when in ambient mode."""
+    """Component to manage the required relations to Istio when in ambient mode.
+
+    The service mesh and ingress route libraries, and their lightkube, httpx and pydantic
+    dependencies, are only imported and instantiated when one of the ambient mode relations
+    exists or is the subject of the current hook, so that they do not slow down the dispatch of
+    hooks in sidecar mode. Until then, `charm.ambient_mode_ingress` is None.
+    """
 
     def __init__(
         self,
@@ -37,6 +34,7 @@ class AmbientIngressRequirerComponent(Component):
         relation_name: str,
         service_name: str,
         service_port: int,
+        lightkube_client_getter: Callable[[], Client],
         **kwargs,
     ):
         super().__init__(*args, **kwargs)
@@ -47,8 +45,18 @@ class AmbientIngressRequirerComponent(Component):
         self.service_name = service_name
         self.service_port = service_port
 
-        self._mesh = ServiceMeshConsumer(
+        self._mesh = None
+        self._charm.ambient_mode_ingress = None
+        if not self._has_ambient_relations():
+            return
+
+        from charms.istio_ingress_k8s.v0.istio_ingress_route import IstioIngressRouteRequirer
+
+        from components.service_mesh_consumer import SharedClientServiceMeshConsumer
+
+        self._mesh = SharedClientServiceMeshConsumer(
             self._charm,
+            lightkube_client_getter=lightkube_client_getter,
             # NOTE: no (additional) AuthorizationPolicies are necessary because:
             # - the one required for traffic from the ingress route is already created by the
             #   ingress-route provider itself and we therefore don't need to create it on the
@@ -69,8 +77,22 @@ class AmbientIngressRequirerComponent(Component):
         )
         self._events_to_observe = [self._charm.ambient_mode_ingress.on.ready]
 
+    @property
+    def ambient_relation_names(self) -> List[str]:
+        """Return the names of the relations that enable the ambient mode libraries."""
+        return [self.relation_name, *SERVICE_MESH_RELATION_NAMES]
+
+    def _has_ambient_relations(self) -> bool:
+        # JUJU_RELATION covers relation-broken hooks, where the relation is no longer listed
+        return os.environ.get("JUJU_RELATION") in self.ambient_relation_names or any(
+            self._charm.model.relations[name] for name in self.ambient_relation_names
+        )
+
     def _configure_app_leader(self, _):
-        if self._charm.ambient_mode_ingress.is_ready():
+        if self._charm.ambient_mode_ingress is None:
+            logger.debug("No ambient mode relations, skipping config submission.")
+        elif self._charm.ambient_mode_ingress.is_ready():
+            # submit_config sets the app databag, where ops does not rewrite unchanged values
             try:
                 self._charm.ambient_mode_ingress.submit_config(self._get_ingress_config())
             except Exception as e:
@@ -79,6 +101,20 @@ class AmbientIngressRequirerComponent(Component):
             logger.debug("Ambient ingress relation not ready, skipping config submission.")
 
     def _get_ingress_config(self):
+        from charms.istio_ingress_k8s.v0.istio_ingress_route import (
+            BackendRef,
+            HTTPPathMatch,
+            HTTPRoute,
+            HTTPRouteMatch,
+            IstioIngressRouteConfig,
+            Listener,
+            PathModifier,
+            PathModifierType,
+            ProtocolType,
+            URLRewriteFilter,
+            URLRewriteSpec,
+        )
+
         http_listener = Listener(
             port=80,  # expecting ingress traffic to come through the default HTTP port: 80
             protocol=ProtocolType.HTTP,  # expecting ingress traffic via HTTP
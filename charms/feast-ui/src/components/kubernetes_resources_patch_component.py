@@ -0,0 +1,184 @@
+# Copyright 2026 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Component to patch the compute resources of a workload container."""
+
+import logging
+from decimal import Decimal
+from typing import Callable, Dict, Optional
+
+from charmed_kubeflow_chisme.components.component import Component
+from charmed_kubeflow_chisme.exceptions import ErrorWithStatus, GenericCharmRuntimeError
+from lightkube import Client
+from lightkube.core.exceptions import ApiError
+from lightkube.resources.apps_v1 import StatefulSet
+from lightkube.types import PatchType
+from lightkube.utils.quantity import parse_quantity
+from ops import ActiveStatus, BlockedStatus, CharmBase, StatusBase, WaitingStatus
+
+logger = logging.getLogger(__name__)
+
+# (resource type, requirement) for each config option, e.g. ("cpu", "requests") for "cpu-request"
+CONFIG_OPTIONS_TO_RESOURCES = {
+    "cpu-request": ("cpu", "requests"),
+    "cpu-limit": ("cpu", "limits"),
+    "memory-request": ("memory", "requests"),
+    "memory-limit": ("memory", "limits"),
+}
+
+ResourceRequirements = Dict[str, Dict[str, Optional[str]]]
+
+
+class KubernetesResourcesPatchComponent(Component):
+    """Patches the CPU and memory requests and limits of a container of the charm's StatefulSet.
+
+    The requests and limits are read from the charm config options listed in
+    CONFIG_OPTIONS_TO_RESOURCES, where an empty value leaves that resource unset. The StatefulSet
+    is only patched when the applied resources differ from the configured ones. Patching changes
+    the pod template of the StatefulSet, so Kubernetes replaces the pod to apply the new values.
+    The applied resources are read at most once per dispatch. They are read on the leader even
+    when no resources are configured, so that the values set by a previous leader are removed.
+
+    Args:
+        charm(CharmBase): the charm owning the StatefulSet
+        name(str): name of this component
+        container_name(str): name of the container whose resources are patched
+        lightkube_client_getter(Callable): returns the lightkube Client to use
+    """
+
+    def __init__(
+        self,
+        charm: CharmBase,
+        name: str,
+        container_name: str,
+        lightkube_client_getter: Callable[[], Client],
+    ):
+        super().__init__(charm, name)
+        self.container_name = container_name
+        self._lightkube_client_getter = lightkube_client_getter
+        # the resources applied to the StatefulSet, as read or patched during this dispatch
+        self._applied_requirements: Optional[ResourceRequirements] = None
+
+    def get_resource_requirements(self) -> ResourceRequirements:
+        """Return the configured requests and limits, validated.
+
+        Raises:
+            ErrorWithStatus: if a value is not a valid quantity or a limit is below its request.
+        """
+        requirements: ResourceRequirements = {"requests": {}, "limits": {}}
+        for option, (resource, requirement) in CONFIG_OPTIONS_TO_RESOURCES.items():
+            value = str(self._charm.model.config[option]).strip()
+            if value and _parse_quantity(value) is None:
+                raise ErrorWithStatus(f"Invalid value for {option}: '{value}'", BlockedStatus)
+            requirements[requirement][resource] = value or None
+
+        for resource in ("cpu", "memory"):
+            request = requirements["requests"][resource]
+            limit = requirements["limits"][resource]
+            if request and limit and _parse_quantity(limit) < _parse_quantity(request):
+                raise ErrorWithStatus(
+                    f"{resource}-limit ({limit}) must not be lower than {resource}-request "
+                    f"({request})",
+                    BlockedStatus,
+                )
+        return requirements
+
+    def get_applied_resource_requirements(self) -> ResourceRequirements:
+        """Return the requests and limits currently set on the container in the StatefulSet.
+
+        The StatefulSet is only read on the first call of a dispatch, later calls return the
+        requests and limits read or patched since.
+        """
+        if self._applied_requirements is not None:
+            return self._applied_requirements
+        stateful_set = self._lightkube_client_getter().get(
+            StatefulSet, name=self._charm.app.name, namespace=self._charm.model.name
+        )
+        requirements: ResourceRequirements = {"requests": {}, "limits": {}}
+        for container in stateful_set.spec.template.spec.containers:
+            if container.name == self.container_name and container.resources:
+                requirements["requests"].update(container.resources.requests or {})
+                requirements["limits"].update(container.resources.limits or {})
+        self._applied_requirements = requirements
+        return requirements
+
+    def _configure_app_leader(self, event):
+        """Patch the StatefulSet if the configured resources are not applied yet."""
+        requirements = self.get_resource_requirements()
+        try:
+            if _equals(requirements, self.get_applied_resource_requirements()):
+                return
+            logger.info(f"Patching {self.container_name} container resources: {requirements}")
+            self._lightkube_client_getter().patch(
+                StatefulSet,
+                name=self._charm.app.name,
+                namespace=self._charm.model.name,
+                obj={
+                    "spec": {
+                        "template": {
+                            "spec": {
+                                "containers": [
+                                    # None values remove previously set requests or limits
+                                    {"name": self.container_name, "resources": requirements}
+                                ]
+                            }
+                        }
+                    }
+                },
+                patch_type=PatchType.STRATEGIC,
+            )
+        except ApiError as e:
+            raise GenericCharmRuntimeError(f"Failed to patch container resources: {e}") from e
+        self._applied_requirements = requirements
+
+    def get_status(self) -> StatusBase:
+        """Return Active with the applied requests and limits, if any are configured."""
+        try:
+            requirements = self.get_resource_requirements()
+        except ErrorWithStatus as err:
+            return err.status
+
+        if not _is_set(requirements):
+            return ActiveStatus()
+
+        try:
+            applied = self.get_applied_resource_requirements()
+        except ApiError as e:
+            return BlockedStatus(f"Failed to read container resources: {e}")
+
+        if not _equals(requirements, applied):
+            return WaitingStatus("Waiting for container resources to be applied")
+        return ActiveStatus(_format(applied))
+
+
+def _parse_quantity(value: str) -> Optional[Decimal]:
+    try:
+        return parse_quantity(value)
+    except ValueError:
+        return None
+
+
+def _is_set(requirements: ResourceRequirements) -> bool:
+    return any(value for values in requirements.values() for value in values.values())
+
+
+def _equals(desired: ResourceRequirements, applied: ResourceRequirements) -> bool:
+    """Return whether the applied requirements match the desired ones, comparing quantities."""
+    for requirement, values in desired.items():
+        for resource, value in values.items():
+            applied_value = applied[requirement].get(resource)
+            if value is None or applied_value is None:
+                if value != applied_value:
+                    return False
+            elif _parse_quantity(value) != _parse_quantity(applied_value):
+                return False
+    return True
+
+
+def _format(requirements: ResourceRequirements) -> str:
+    return "; ".join(
+        f"{requirement}: "
+        + ", ".join(f"{resource}={value}" for resource, value in sorted(values.items()) if value)
+        for requirement, values in requirements.items()
+        if any(values.values())
+    )
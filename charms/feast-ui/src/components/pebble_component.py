@@ -3,19 +3,125 @@
 """Defines Chisme components for the charm."""
 
 import logging
+from typing import List, Optional
 
 from charmed_kubeflow_chisme.components.pebble_component import PebbleServiceComponent
-from ops.pebble import Layer
+from charmed_kubeflow_chisme.exceptions import ErrorWithStatus
+from ops import BlockedStatus, StatusBase
+from ops.pebble import Layer, ServiceInfo
 
 logger = logging.getLogger(__name__)
 
+REGISTRY_SNAPSHOT_SERVICE_NAME = "registry-snapshot"
+
 
 class FeastUIPebbleService(PebbleServiceComponent):
-    """Pebble service component for Feast UI."""
+    """Pebble service component for Feast UI.
+
+    When a registry snapshot is configured, the UI is started from the snapshot whenever one
+    exists, and an additional service keeps the snapshot up to date with the registry. The
+    snapshot is written to the registry snapshot storage, so the component is blocked if a
+    snapshot is configured while the storage is not attached, or if the interval is negative.
+
+    The snapshot service stays in the layer once the snapshot is disabled, with startup disabled,
+    because the layer is combined with the plan: leaving it out would keep the previous
+    definition in the plan, and the service running.
+    """
 
-    def __init__(self, app_port: int, *args, **kwargs):
+    def __init__(
+        self,
+        app_port: int,
+        *args,
+        feature_store_yaml_path: str,
+        registry_snapshot_feature_store_yaml_path: Optional[str] = None,
+        registry_snapshot_path: Optional[str] = None,
+        registry_snapshot_refresh_interval: int = 0,
+        registry_snapshot_script_path: Optional[str] = None,
+        registry_snapshot_storage_name: Optional[str] = None,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.app_port = app_port
+        self.feature_store_yaml_path = feature_store_yaml_path
+        self.registry_snapshot_feature_store_yaml_path = registry_snapshot_feature_store_yaml_path
+        self.registry_snapshot_path = registry_snapshot_path
+        self.registry_snapshot_refresh_interval = registry_snapshot_refresh_interval
+        self.registry_snapshot_script_path = registry_snapshot_script_path
+        self.registry_snapshot_storage_name = registry_snapshot_storage_name
+
+    @property
+    def registry_snapshot_enabled(self) -> bool:
+        """Return whether the UI should be warm-started from a registry snapshot."""
+        return self.registry_snapshot_refresh_interval > 0
+
+    def validate_registry_snapshot(self):
+        """Check the registry snapshot can be set up as configured.
+
+        Raises:
+            ErrorWithStatus: if the refresh interval is negative, or if a snapshot is configured
+                while the registry snapshot storage is not attached.
+        """
+        if self.registry_snapshot_refresh_interval < 0:
+            raise ErrorWithStatus(
+                "Invalid value for registry-snapshot-refresh-interval:"
+                f" '{self.registry_snapshot_refresh_interval}', expected 0 or more",
+                BlockedStatus,
+            )
+        if (
+            self.registry_snapshot_enabled
+            and not self._charm.model.storages[self.registry_snapshot_storage_name]
+        ):
+            # storage can only be attached to Kubernetes charms when they are deployed
+            raise ErrorWithStatus(
+                f"registry-snapshot-refresh-interval requires the"
+                f" {self.registry_snapshot_storage_name} storage, deploy with it or set it to 0",
+                BlockedStatus,
+            )
+
+    def _configure_unit(self, event):
+        """Check the registry snapshot config before pushing the files and the layer."""
+        self.validate_registry_snapshot()
+        super()._configure_unit(event)
+
+    def _update_layer(self):
+        """Update the layer, stopping the registry snapshot service if it was disabled."""
+        super()._update_layer()
+        if self.registry_snapshot_enabled:
+            return
+        container = self._charm.unit.get_container(self.container_name)
+        service = container.get_services(REGISTRY_SNAPSHOT_SERVICE_NAME).get(
+            REGISTRY_SNAPSHOT_SERVICE_NAME
+        )
+        if service and service.is_running():
+            container.stop(REGISTRY_SNAPSHOT_SERVICE_NAME)
+
+    def get_services_not_active(self) -> List[ServiceInfo]:
+        """Return the services that should be running but are not.
+
+        The registry snapshot service is left out when the snapshot is disabled, as it is then
+        expected to be inactive.
+        """
+        services_not_active = super().get_services_not_active()
+        if self.registry_snapshot_enabled:
+            return services_not_active
+        return [
+            service
+            for service in services_not_active
+            if service.name != REGISTRY_SNAPSHOT_SERVICE_NAME
+        ]
+
+    def get_status(self) -> StatusBase:
+        """Return Blocked if the registry snapshot config is invalid, else the services status."""
+        try:
+            self.validate_registry_snapshot()
+        except ErrorWithStatus as err:
+            return err.status
+        return super().get_status()
+
+    def _get_ui_command(self, feature_store_yaml_path: Optional[str] = None) -> str:
+        # without an explicit path, feast reads the feature_store.yaml from the working dir
+        feast = f"feast -f {feature_store_yaml_path}" if feature_store_yaml_path else "feast"
+        return f"{feast} ui --host 0.0.0.0 --port {self.app_port} --root_path /feast"
 
     def get_layer(self) -> Layer:
         """Return Pebble layer configuration for the service.
@@ -23,20 +129,42 @@ class FeastUIPebbleService(PebbleServiceComponent):
         This method is required for subclassing PebbleServiceContainer.
         """
         logger.info("PebbleServiceComponent.get_layer executing")
+        command = self._get_ui_command()
+        services = {
+            REGISTRY_SNAPSHOT_SERVICE_NAME: {
+                "override": "replace",
+                "summary": "Periodically snapshot the Feast registry to storage",
+                "command": (
+                    f"python3 {self.registry_snapshot_script_path}"
+                    f" --feature-store-yaml {self.feature_store_yaml_path}"
+                    f" --destination {self.registry_snapshot_path}"
+                    f" --interval {self.registry_snapshot_refresh_interval}"
+                ),
+                "startup": "enabled" if self.registry_snapshot_enabled else "disabled",
+                "working-dir": "/home/ubuntu",
+            }
+        }
+
+        if self.registry_snapshot_enabled:
+            # start from the snapshot if a previous run wrote one, otherwise from the registry
+            snapshot_command = self._get_ui_command(self.registry_snapshot_feature_store_yaml_path)
+            command = (
+                f"bash -c 'if [ -s {self.registry_snapshot_path} ];"
+                f" then exec {snapshot_command}; else exec {command}; fi'"
+            )
+
+        services[self.service_name] = {
+            "override": "replace",
+            "summary": "Entry point for feast-ui image",
+            "command": command,
+            "startup": "enabled",
+            "working-dir": "/home/ubuntu",
+        }
+
         return Layer(
             {
                 "summary": "feast-ui layer",
                 "description": "Pebble config layer for feast-ui",
-                "services": {
-                    self.service_name: {
-                        "override": "replace",
-                        "summary": "Entry point for feast-ui image",
-                        "command": (
-                            f"feast ui --host 0.0.0.0 --port {self.app_port} --root_path /feast"
-                        ),
-                        "startup": "enabled",
-                        "working-dir": "/home/ubuntu",
-                    }
-                },
+                "services": services,
             }
         )
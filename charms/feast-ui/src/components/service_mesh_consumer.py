@@ -0,0 +1,39 @@
+# Copyright 2026 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""ServiceMeshConsumer that makes its Kubernetes API calls with the charm's lightkube client."""
+
+from typing import Callable
+
+from charms.istio_beacon_k8s.v0.service_mesh import ServiceMeshConsumer
+from lightkube import Client
+from ops import CharmBase
+
+
+class SharedClientServiceMeshConsumer(ServiceMeshConsumer):
+    """ServiceMeshConsumer that uses the lightkube Client shared by the charm's components.
+
+    All API calls are made with the lightkube Client returned by lightkube_client_getter, so that
+    the charm can share a single client, and its connections, between its components. The
+    client is only built once it is first used.
+
+    Args:
+        charm(CharmBase): the charm joining the mesh
+        lightkube_client_getter(Callable): returns the lightkube Client to use
+        *args, **kwargs: the arguments of ServiceMeshConsumer
+    """
+
+    def __init__(
+        self,
+        charm: CharmBase,
+        *args,
+        lightkube_client_getter: Callable[[], Client],
+        **kwargs,
+    ):
+        super().__init__(charm, *args, **kwargs)
+        self._lightkube_client_getter = lightkube_client_getter
+
+    @property
+    def lightkube_client(self) -> Client:
+        """Return the lightkube Client shared with the rest of the charm."""
+        return self._lightkube_client_getter()
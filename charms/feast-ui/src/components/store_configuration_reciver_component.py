@@ -7,7 +7,7 @@ from typing import Optional
 
 from charmed_kubeflow_chisme.components.component import Component
 from charmed_kubeflow_chisme.exceptions import ErrorWithStatus
-from charms.feast_integrator.v0.feast_store_configuration import (
+from charms.feast_integrator.v1.feast_store_configuration import (
     FeastStoreConfigurationDataInvalidError,
     FeastStoreConfigurationRelationDataMissingError,
     FeastStoreConfigurationRelationError,
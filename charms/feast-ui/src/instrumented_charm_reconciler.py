@@ -0,0 +1,99 @@
+# Copyright 2026 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""A CharmReconciler that measures the time spent in each of its Components.
+
+For every Component added to the reconciler, the calls to `configure_charm` and `get_status` are
+timed. At the end of each hook, the totals are written to the charm logs as one JSON line per
+Component. Each call is also wrapped in a span, so that when the charm is related to a tracing
+provider the time of each Component shows in the trace of the hook.
+
+Durations are inclusive: when a Component calls another Component's `get_status`, the inner call
+is counted both for itself and for its caller. The relation, secret and Pebble calls of each hook
+are counted by the benchmarks, as ops offers no public hook to count them in the charm.
+"""
+
+import dataclasses
+import functools
+import json
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from charmed_kubeflow_chisme.components.charm_reconciler import CharmReconciler
+from charmed_kubeflow_chisme.components.component import Component
+from charmed_kubeflow_chisme.components.component_graph_item import ComponentGraphItem
+from opentelemetry import trace
+from ops import CharmBase
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+INSTRUMENTED_COMPONENT_METHODS = ["configure_charm", "get_status"]
+
+
+@dataclasses.dataclass
+class MethodMetrics:
+    """The accumulated time of the calls to one method of a Component during a hook."""
+
+    calls: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        """Return the metrics as a JSON-serializable dict."""
+        return {"calls": self.calls, "seconds": round(self.seconds, 6)}
+
+
+class InstrumentedCharmReconciler(CharmReconciler):
+    """A CharmReconciler that records per-Component timing for each hook.
+
+    The metrics of the current hook are available in `component_metrics`, keyed by Component
+    name and then by method name.
+    """
+
+    def __init__(self, charm: CharmBase, *args, **kwargs):
+        super().__init__(charm, *args, **kwargs)
+        self.component_metrics: Dict[str, Dict[str, MethodMetrics]] = {}
+        self._charm.framework.observe(self._charm.framework.on.commit, self._log_metrics)
+
+    def add(
+        self,
+        component: Component,
+        depends_on: Optional[List[ComponentGraphItem]] = None,
+    ) -> ComponentGraphItem:
+        """Add a component to the graph, timing its methods."""
+        self.component_metrics[component.name] = {}
+        for method_name in INSTRUMENTED_COMPONENT_METHODS:
+            metrics = self.component_metrics[component.name][method_name] = MethodMetrics()
+            method = getattr(component, method_name)
+            setattr(component, method_name, self._timed(component, method, metrics))
+        return super().add(component, depends_on)
+
+    @staticmethod
+    def _timed(component: Component, method: Callable, metrics: MethodMetrics) -> Callable:
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            with tracer.start_as_current_span(f"{component.name}: {method.__name__}"):
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    metrics.calls += 1
+                    metrics.seconds += time.perf_counter() - start
+
+        return wrapper
+
+    def _log_metrics(self, _):
+        for component_name, methods in self.component_metrics.items():
+            if not any(metrics.calls for metrics in methods.values()):
+                continue
+            logger.info(
+                "Component metrics: %s",
+                json.dumps(
+                    {
+                        "component": component_name,
+                        **{name: metrics.as_dict() for name, metrics in methods.items()},
+                    },
+                    sort_keys=True,
+                ),
+            )
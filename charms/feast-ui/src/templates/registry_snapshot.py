@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Periodically write a snapshot of the Feast registry to local storage.
+
+This script runs as a Pebble service in the feast-ui container. It loads the registry described
+by a feature_store.yaml (usually the SQL registry) and serializes it as a file registry, which the
+UI can start from without loading the full registry from the database.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from feast import FeatureStore
+
+logger = logging.getLogger("registry-snapshot")
+
+
+def write_snapshot(store: FeatureStore, destination: Path) -> None:
+    """Write the current registry of the store to destination, replacing it atomically."""
+    registry_proto = store.registry.proto()
+    with tempfile.NamedTemporaryFile(dir=destination.parent, delete=False) as f:
+        f.write(registry_proto.SerializeToString())
+        tmp_path = f.name
+    os.replace(tmp_path, destination)
+
+
+def main():
+    """Refresh the registry snapshot forever, every `--interval` seconds."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--feature-store-yaml", required=True, type=Path)
+    parser.add_argument("--destination", required=True, type=Path)
+    parser.add_argument("--interval", required=True, type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    store = FeatureStore(fs_yaml_file=args.feature_store_yaml)
+
+    while True:
+        start = time.monotonic()
+        try:
+            write_snapshot(store, args.destination)
+            logger.info(
+                "Wrote registry snapshot to %s in %.2fs",
+                args.destination,
+                time.monotonic() - start,
+            )
+        except Exception:
+            logger.exception("Failed to write registry snapshot, retrying in %ss", args.interval)
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
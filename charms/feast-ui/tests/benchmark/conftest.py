@@ -0,0 +1,164 @@
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator
+from unittest.mock import patch
+
+import pytest
+from ops.model import Container
+from ops.testing import Context, State
+from scenario.mocking import _MockModelBackend
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+# Number of times each hook is run to measure its wall time, the median is kept
+ROUNDS = 10
+# (class, method) of the hook tool and Pebble calls to count, by the name of their counter
+IO_CALLS_TO_COUNT = {
+    "relation_get": (_MockModelBackend, "relation_get"),
+    "relation_set": (_MockModelBackend, "relation_set"),
+    "secret_get": (_MockModelBackend, "secret_get"),
+    "pebble_push": (Container, "push"),
+}
+
+
+@dataclass
+class HookMeasurement:
+    """The cost of running a hook of the charm.
+
+    Only the I/O counts are stored in the baseline and compared with it, as they do not depend on
+    the machine running the benchmark. The wall time and peak memory are reported only.
+    """
+
+    seconds: float
+    peak_memory_bytes: int
+    io: Dict[str, int] = field(default_factory=dict)
+
+
+@contextmanager
+def _isolated_logging():
+    """Run without the root log handlers added so far, and remove the ones added meanwhile.
+
+    Every run sets up Juju logging again on the root logger, and the handlers of earlier runs,
+    including the ones of other tests, would otherwise keep receiving the log lines of the next
+    ones, making each run slower.
+    """
+    root_logger = logging.getLogger()
+    handlers, level = root_logger.handlers[:], root_logger.level
+    root_logger.handlers.clear()
+    try:
+        yield
+    finally:
+        root_logger.handlers[:] = handlers
+        root_logger.setLevel(level)
+
+
+@contextmanager
+def _counted_io() -> Iterator[Counter]:
+    """Count the hook tool and Pebble calls made meanwhile, as listed in IO_CALLS_TO_COUNT."""
+    counts: Counter = Counter()
+    with ExitStack() as stack:
+        for counter, (cls, method_name) in IO_CALLS_TO_COUNT.items():
+            mock = stack.enter_context(
+                patch.object(
+                    cls, method_name, autospec=True, side_effect=getattr(cls, method_name)
+                )
+            )
+            stack.callback(
+                lambda counter=counter, mock=mock: counts.update({counter: mock.call_count})
+            )
+        yield counts
+
+
+def _measure_hook(
+    ctx_getter: Callable[[], Context], event_getter: Callable[[Context], Any], state: State
+) -> HookMeasurement:
+    """Run the event returned by event_getter on state and return the cost of the hook.
+
+    Each run uses a new Context, so that the output collected by earlier runs does not add to
+    the cost of the next ones. The wall time covers the charm's instantiation, the event's
+    dispatch and the commit of the state, as a real hook would. The I/O counts are the calls
+    made to the mocked hook tools and Pebble during a separate run, so that counting them does
+    not add to the wall time.
+    """
+    durations = []
+    for _ in range(ROUNDS):
+        ctx = ctx_getter()
+        with _isolated_logging():
+            start = time.perf_counter()
+            ctx.run(event_getter(ctx), state)
+            durations.append(time.perf_counter() - start)
+
+    ctx = ctx_getter()
+    with _isolated_logging(), _counted_io() as counts:
+        ctx.run(event_getter(ctx), state)
+    io = {name: count for name, count in sorted(counts.items()) if count}
+
+    ctx = ctx_getter()
+    event = event_getter(ctx)
+    with _isolated_logging():
+        tracemalloc.start()
+        try:
+            ctx.run(event, state)
+            _, peak_memory_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return HookMeasurement(
+        seconds=round(statistics.median(durations), 6),
+        peak_memory_bytes=peak_memory_bytes,
+        io=io,
+    )
+
+
+@pytest.fixture(scope="session")
+def measure_hook() -> Callable[..., HookMeasurement]:
+    """Return a function measuring the cost of running an event on a state."""
+    return _measure_hook
+
+
+@pytest.fixture(scope="session")
+def baseline(request: pytest.FixtureRequest):
+    """Return a function checking the I/O counts of a hook against the stored ones.
+
+    A hook must not make more calls of any kind than stored. With --update-baseline, the I/O
+    counts of the session replace the stored ones instead of being compared with them. When a
+    change lowers the I/O of a hook, the baseline should be updated along with it.
+    """
+    update = request.config.getoption("--update-baseline")
+    stored = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    measurements: Dict[str, HookMeasurement] = {}
+
+    def check(hook: str, measurement: HookMeasurement):
+        print(f"\n[benchmark] {hook}: {json.dumps(asdict(measurement), sort_keys=True)}")
+        measurements[hook] = measurement
+        if update:
+            return
+        if hook not in stored:
+            pytest.fail(f"No baseline for {hook}, run the benchmark with --update-baseline")
+        expected_io = stored[hook]["io"]
+
+        for name, count in measurement.io.items():
+            assert count <= expected_io.get(name, 0), (
+                f"{hook} made {count} {name} calls, baseline is {expected_io.get(name, 0)}"
+            )
+
+    yield check
+
+    if update and measurements:
+        stored.update({hook: {"io": measurement.io} for hook, measurement in measurements.items()})
+        BASELINE_PATH.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-baseline",
+        action="store_true",
+        default=False,
+        help="store the measurements as the new baseline instead of comparing with it",
+    )
@@ -0,0 +1,100 @@
+import json
+from pathlib import Path
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import ops
+import pytest
+import yaml
+from charms.feast_integrator.v1.feast_store_configuration import (
+    FeastStoreConfiguration,
+    compute_config_hash,
+)
+from ops.testing import Container, Context, Relation, Secret, State
+
+from charm import FeastUICharm
+
+CONFIG = yaml.safe_load(Path("./config.yaml").read_text())
+METADATA = yaml.safe_load(Path("./metadata.yaml").read_text())
+STORE_CONFIGURATION = {
+    f"{store}_{key}": value
+    for store in ["registry", "offline_store", "online_store"]
+    for key, value in {
+        "host": "10.0.0.1",
+        "port": "5432",
+        "database": store,
+        "user": f"{store}-user",
+        "password": "pw",
+    }.items()
+}
+
+
+def new_context() -> Context:
+    return Context(FeastUICharm, meta=METADATA, config=CONFIG, actions={}, unit_id=0)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def lightkube_client():
+    """Mock the lightkube Client of the charm, which reads the StatefulSet on the leader."""
+    with patch("charm.FeastUICharm.lightkube_client", new_callable=PropertyMock) as mock:
+        mock.return_value = MagicMock()
+        yield mock.return_value
+
+
+@pytest.fixture(scope="module")
+def state_in():
+    """Return the state of a leader unit with the store configuration received."""
+    config, credentials = FeastStoreConfiguration(**STORE_CONFIGURATION).to_relation_data()
+    revision = "0123456789abcdef0123456789abcdef"
+    secret = Secret(tracked_content={**credentials, "revision": revision}, owner=None)
+    return State(
+        leader=True,
+        relations=[
+            Relation(
+                endpoint="feast-configuration",
+                interface="feast_configuration",
+                remote_app_name="feast-integrator",
+                remote_app_data={
+                    "config": json.dumps(config, sort_keys=True),
+                    "config_hash": compute_config_hash(config, revision),
+                    "credentials": secret.id,
+                    "revision": revision,
+                },
+            )
+        ],
+        secrets=[secret],
+        containers=[Container(name="feast-ui", can_connect=True)],
+    )
+
+
+@pytest.fixture(scope="module")
+def installed_state(state_in):
+    """Return the state after install, the starting point of the hooks that follow it."""
+    ctx = new_context()
+    state_out = ctx.run(ctx.on.install(), state_in)
+    assert state_out.unit_status == ops.ActiveStatus()
+    return state_out
+
+
+def test_install(state_in, baseline, measure_hook):
+    """Benchmark install with the store configuration received."""
+    baseline("install", measure_hook(new_context, lambda ctx: ctx.on.install(), state_in))
+
+
+@pytest.mark.parametrize("hook", ["config-changed", "update-status"])
+def test_hook(installed_state, baseline, measure_hook, hook):
+    """Benchmark the hooks that run the reconciler without changing its inputs."""
+    baseline(
+        hook,
+        measure_hook(
+            new_context, lambda ctx: getattr(ctx.on, hook.replace("-", "_"))(), installed_state
+        ),
+    )
+
+
+def test_relation_changed(installed_state, baseline, measure_hook):
+    """Benchmark relation-changed of the relation the store configuration is received over."""
+    relation = installed_state.get_relations("feast-configuration")[0]
+    baseline(
+        "feast-configuration-relation-changed",
+        measure_hook(new_context, lambda ctx: ctx.on.relation_changed(relation), installed_state),
+    )
@@ -1,12 +1,25 @@
+import dataclasses
+import json
+import os
+import subprocess
+import sys
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock, PropertyMock, patch
 
 import ops
 import pytest
 import yaml
 from charmed_kubeflow_chisme.exceptions import ErrorWithStatus
+from lightkube.models.apps_v1 import StatefulSetSpec
+from lightkube.models.core_v1 import Container as K8sContainer
+from lightkube.models.core_v1 import PodSpec, PodTemplateSpec, ResourceRequirements
+from lightkube.models.meta_v1 import LabelSelector
+from lightkube.resources.apps_v1 import StatefulSet
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
 from ops.model import ActiveStatus, BlockedStatus, WaitingStatus
-from ops.testing import Container, Context, State
+from ops.testing import Container, Context, State, Storage
 
 from charm import FeastUICharm
 
@@ -19,6 +32,7 @@ RELATION_ENDPOINT_FOR_INGRESS_IN_SIDECAR_MODE = "ingress"
 RELATION_INTERFACE_FOR_FEAST_CONFIGURATIONS = "feast_configuration"
 RELATION_INTERFACE_FOR_INGRESS_IN_AMBIENT_MODE = "istio_ingress_route"
 RELATION_INTERFACE_FOR_INGRESS_IN_SIDECAR_MODE = "ingress"
+CONFIG = yaml.safe_load(Path("./config.yaml").read_text())
 METADATA = yaml.safe_load(Path("./metadata.yaml").read_text())
 MOCKED_VALID_FEATURE_STORE_CONFIGURATIONS = """project: my_project
 registry: data/registry.db
@@ -30,12 +44,52 @@ entity_key_serialization_version: 2
 """
 
 
+def _stateful_set(requests=None, limits=None) -> StatefulSet:
+    """Return a feast-ui StatefulSet whose container has the given resources."""
+    return StatefulSet(
+        spec=StatefulSetSpec(
+            selector=LabelSelector(),
+            serviceName="feast-ui",
+            template=PodTemplateSpec(
+                spec=PodSpec(
+                    containers=[
+                        K8sContainer(
+                            name="feast-ui",
+                            resources=ResourceRequirements(requests=requests, limits=limits),
+                        )
+                    ]
+                )
+            ),
+        )
+    )
+
+
 @pytest.fixture()
 def ctx() -> Context:
-    ctx = Context(FeastUICharm, meta=METADATA, config={}, actions={}, unit_id=0)
+    ctx = Context(FeastUICharm, meta=METADATA, config=CONFIG, actions={}, unit_id=0)
     return ctx
 
 
+@pytest.fixture(autouse=True)
+def lightkube_client():
+    """Mock the lightkube Client of the charm, with no resources applied to the StatefulSet."""
+    client = MagicMock()
+    client.get.return_value = _stateful_set()
+    with patch("charm.FeastUICharm.lightkube_client", new_callable=PropertyMock) as mock:
+        mock.return_value = client
+        yield client
+
+
+@pytest.fixture()
+def span_exporter():
+    """Collect the spans of the charm's components in memory, like a local OTLP collector."""
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    with patch("instrumented_charm_reconciler.tracer", provider.get_tracer(__name__)):
+        yield exporter
+
+
 @pytest.mark.parametrize(
     "leader, expected_status",
     [
@@ -269,3 +323,352 @@ def test_ambient_mode_ingress_configurations(
 
             else:
                 ingress_submit_config.assert_not_called()
+
+
+@patch("charm.FeastUICharm.lightkube_client", new_callable=PropertyMock)
+@patch("charms.istio_beacon_k8s.v0.service_mesh.reconcile_charm_labels")
+def test_service_mesh_labels_applied_with_charm_client(
+    mock_reconcile_charm_labels, mock_lightkube_client, ctx
+):
+    """Test the mesh labels are reconciled on each change of the mesh, with the charm's client."""
+    # arrange:
+    mesh_relation = ops.testing.Relation(
+        endpoint="service-mesh",
+        interface="service_mesh",
+        remote_app_data={
+            "labels": json.dumps({"istio.io/dataplane-mode": "ambient"}),
+            "mesh_type": json.dumps("istio"),
+        },
+    )
+    state_in = State(leader=True, relations=[mesh_relation])
+
+    # act:
+    state_applied = ctx.run(ctx.on.relation_changed(mesh_relation), state_in)
+    ctx.run(ctx.on.relation_changed(mesh_relation), state_applied)
+
+    # assert:
+    # the labels are reconciled again, in case they were removed from the Kubernetes objects
+    assert mock_reconcile_charm_labels.call_count == 2
+    for call in mock_reconcile_charm_labels.call_args_list:
+        assert call.kwargs["client"] is mock_lightkube_client.return_value
+        assert call.kwargs["labels"] == {"istio.io/dataplane-mode": "ambient"}
+
+
+@patch(
+    "components.store_configuration_reciver_component.StoreConfigurationReceiverComponent"
+    ".get_feature_store_yaml",
+    return_value=MOCKED_VALID_FEATURE_STORE_CONFIGURATIONS,
+)
+@pytest.mark.parametrize("refresh_interval", [0, 300], ids=["disabled", "enabled"])
+def test_registry_snapshot(mock_get_yaml, ctx, refresh_interval):
+    """Test the registry snapshot service and files are only set up when configured."""
+    # arrange:
+    state_in = State(
+        leader=True,
+        config={"registry-snapshot-refresh-interval": refresh_interval},
+        relations=[
+            ops.testing.Relation(
+                endpoint=RELATION_ENDPOINT_FOR_FEAST_CONFIGURATIONS,
+                interface=RELATION_INTERFACE_FOR_FEAST_CONFIGURATIONS,
+            )
+        ],
+        containers=[Container(name="feast-ui", can_connect=True)],
+        storages=[Storage("registry-snapshot")],
+    )
+
+    # act:
+    state_out = ctx.run(ctx.on.install(), state_in)
+
+    # assert:
+    container = state_out.get_container("feast-ui")
+    services = container.layers["feast-ui"].services
+    snapshot_feature_store_yaml = container.get_filesystem(ctx) / (
+        "home/ubuntu/feature_store_snapshot.yaml"
+    )
+    if refresh_interval:
+        assert "registry-snapshot" in services
+        assert f"--interval {refresh_interval}" in services["registry-snapshot"].command
+        assert "feature_store_snapshot.yaml" in services["feast-ui"].command
+        registry = yaml.safe_load(snapshot_feature_store_yaml.read_text())["registry"]
+        assert registry == {
+            "registry_type": "file",
+            "path": "/var/lib/feast/registry-snapshot/registry.db",
+            "cache_ttl_seconds": refresh_interval,
+        }
+    else:
+        assert services["registry-snapshot"].startup == "disabled"
+        assert services["feast-ui"].command.startswith("feast ui ")
+        assert not snapshot_feature_store_yaml.exists()
+
+
+@patch(
+    "components.store_configuration_reciver_component.StoreConfigurationReceiverComponent"
+    ".get_feature_store_yaml",
+    return_value=MOCKED_VALID_FEATURE_STORE_CONFIGURATIONS,
+)
+def test_registry_snapshot_disabled_after_enabled(mock_get_yaml, ctx):
+    """Test disabling the registry snapshot stops its service, and does not wait for it."""
+    # arrange:
+    relation = ops.testing.Relation(
+        endpoint=RELATION_ENDPOINT_FOR_FEAST_CONFIGURATIONS,
+        interface=RELATION_INTERFACE_FOR_FEAST_CONFIGURATIONS,
+    )
+    state_enabled = ctx.run(
+        ctx.on.install(),
+        State(
+            leader=True,
+            config={"registry-snapshot-refresh-interval": 300},
+            relations=[relation],
+            containers=[Container(name="feast-ui", can_connect=True)],
+            storages=[Storage("registry-snapshot")],
+        ),
+    )
+    container = state_enabled.get_container("feast-ui")
+    running = dict.fromkeys(container.plan.services, ops.pebble.ServiceStatus.ACTIVE)
+    state_in = dataclasses.replace(
+        state_enabled,
+        config={"registry-snapshot-refresh-interval": 0},
+        containers=[dataclasses.replace(container, service_statuses=running)],
+    )
+
+    # act:
+    state_out = ctx.run(ctx.on.config_changed(), state_in)
+
+    # assert:
+    container = state_out.get_container("feast-ui")
+    assert container.plan.services["registry-snapshot"].startup == "disabled"
+    assert container.service_statuses["registry-snapshot"] == ops.pebble.ServiceStatus.INACTIVE
+    assert container.service_statuses["feast-ui"] == ops.pebble.ServiceStatus.ACTIVE
+    assert "registry-snapshot" not in state_out.unit_status.message
+
+
+@patch(
+    "components.store_configuration_reciver_component.StoreConfigurationReceiverComponent"
+    ".get_feature_store_yaml",
+    return_value=MOCKED_VALID_FEATURE_STORE_CONFIGURATIONS,
+)
+@pytest.mark.parametrize(
+    "refresh_interval, storages, expected_message",
+    [
+        (
+            -1,
+            [Storage("registry-snapshot")],
+            "Invalid value for registry-snapshot-refresh-interval: '-1', expected 0 or more",
+        ),
+        (
+            300,
+            [],
+            "registry-snapshot-refresh-interval requires the registry-snapshot storage,"
+            " deploy with it or set it to 0",
+        ),
+    ],
+    ids=["negative-interval", "missing-storage"],
+)
+def test_registry_snapshot_blocked(
+    mock_get_yaml, ctx, refresh_interval, storages, expected_message
+):
+    """Test the charm is blocked, without starting the UI, if the snapshot can't be set up."""
+    # arrange:
+    state_in = State(
+        leader=True,
+        config={"registry-snapshot-refresh-interval": refresh_interval},
+        relations=[
+            ops.testing.Relation(
+                endpoint=RELATION_ENDPOINT_FOR_FEAST_CONFIGURATIONS,
+                interface=RELATION_INTERFACE_FOR_FEAST_CONFIGURATIONS,
+            )
+        ],
+        containers=[Container(name="feast-ui", can_connect=True)],
+        storages=storages,
+    )
+
+    # act:
+    state_out = ctx.run(ctx.on.install(), state_in)
+
+    # assert:
+    assert state_out.unit_status == BlockedStatus(f"[feast-ui-pebble-service] {expected_message}")
+    assert not state_out.get_container("feast-ui").layers
+
+
+@pytest.mark.parametrize(
+    "config, expected_message",
+    [
+        ({"cpu-request": "lots"}, "Invalid value for cpu-request: 'lots'"),
+        (
+            {"memory-request": "1Gi", "memory-limit": "512Mi"},
+            "memory-limit (512Mi) must not be lower than memory-request (1Gi)",
+        ),
+    ],
+)
+def test_invalid_resources_config(ctx, config, expected_message):
+    """Test the charm is blocked when the resources config is invalid."""
+    state_in = State(leader=True, config=config)
+
+    state_out = ctx.run(ctx.on.config_changed(), state_in)
+
+    assert state_out.unit_status == BlockedStatus(f"[workload-resources] {expected_message}")
+
+
+@patch(
+    "components.store_configuration_reciver_component.StoreConfigurationReceiverComponent"
+    ".get_feature_store_yaml",
+    return_value=MOCKED_VALID_FEATURE_STORE_CONFIGURATIONS,
+)
+@patch("charm.FeastUICharm.lightkube_client", new_callable=PropertyMock)
+def test_resources_patched(mock_lightkube_client, mock_get_yaml, ctx):
+    """Test the container resources are patched and reported in the status."""
+    # arrange:
+    client = MagicMock()
+    client.get.return_value = _stateful_set()
+
+    def apply_patch(*args, obj, **kwargs):
+        resources = obj["spec"]["template"]["spec"]["containers"][0]["resources"]
+        client.get.return_value = _stateful_set(**resources)
+
+    client.patch.side_effect = apply_patch
+    mock_lightkube_client.return_value = client
+    state_in = State(
+        leader=True,
+        config={"cpu-request": "250m", "memory-limit": "1Gi"},
+        relations=[
+            ops.testing.Relation(
+                endpoint=RELATION_ENDPOINT_FOR_FEAST_CONFIGURATIONS,
+                interface=RELATION_INTERFACE_FOR_FEAST_CONFIGURATIONS,
+            )
+        ],
+        containers=[Container(name="feast-ui", can_connect=True)],
+    )
+
+    # act:
+    state_out = ctx.run(ctx.on.config_changed(), state_in)
+
+    # assert:
+    client.get.assert_called_once()
+    client.patch.assert_called_once()
+    patched_container = client.patch.call_args.kwargs["obj"]["spec"]["template"]["spec"][
+        "containers"
+    ][0]
+    assert patched_container == {
+        "name": "feast-ui",
+        "resources": {
+            "requests": {"cpu": "250m", "memory": None},
+            "limits": {"cpu": None, "memory": "1Gi"},
+        },
+    }
+    assert state_out.unit_status == ActiveStatus(
+        "[workload-resources] requests: cpu=250m; limits: memory=1Gi"
+    )
+
+
+@patch("charm.FeastUICharm.lightkube_client", new_callable=PropertyMock)
+def test_resources_not_patched_when_applied(mock_lightkube_client, ctx):
+    """Test the StatefulSet is not patched when the resources are already applied."""
+    client = MagicMock()
+    client.get.return_value = _stateful_set(requests={"cpu": "0.25"})
+    mock_lightkube_client.return_value = client
+    state_in = State(leader=True, config={"cpu-request": "250m"})
+
+    ctx.run(ctx.on.config_changed(), state_in)
+
+    client.get.assert_called_once()
+    client.patch.assert_not_called()
+
+
+@patch(
+    "components.store_configuration_reciver_component.StoreConfigurationReceiverComponent"
+    ".get_feature_store_yaml",
+    return_value=MOCKED_VALID_FEATURE_STORE_CONFIGURATIONS,
+)
+def test_component_metrics_logged_and_traced(mock_get_yaml, ctx, span_exporter):
+    """Test the time spent in each component is written to the logs and traces."""
+    # arrange:
+    state_in = State(
+        leader=True,
+        relations=[
+            ops.testing.Relation(
+                endpoint=RELATION_ENDPOINT_FOR_FEAST_CONFIGURATIONS,
+                interface=RELATION_INTERFACE_FOR_FEAST_CONFIGURATIONS,
+            )
+        ],
+        containers=[Container(name="feast-ui", can_connect=True)],
+    )
+
+    # act:
+    ctx.run(ctx.on.install(), state_in)
+
+    # assert:
+    metrics = {
+        line["component"]: line
+        for line in (
+            json.loads(log.message.removeprefix("Component metrics: "))
+            for log in ctx.juju_log
+            if log.message.startswith("Component metrics: ")
+        )
+    }
+    configure_metrics = metrics["feast-ui-pebble-service"]["configure_charm"]
+    assert configure_metrics["calls"] == 1
+    assert configure_metrics["seconds"] >= 0
+    span_names = {span.name for span in span_exporter.get_finished_spans()}
+    assert "feast-ui-pebble-service: configure_charm" in span_names
+
+
+def test_resources_removed_after_leader_change(lightkube_client, ctx):
+    """Test a new leader removes the resources a previous leader applied, once unconfigured."""
+    # arrange:
+    lightkube_client.get.return_value = _stateful_set(requests={"cpu": "250m"})
+    state_in = State(leader=True)
+
+    # act:
+    ctx.run(ctx.on.config_changed(), state_in)
+
+    # assert:
+    lightkube_client.get.assert_called_once()
+    patched_container = lightkube_client.patch.call_args.kwargs["obj"]["spec"]["template"]["spec"][
+        "containers"
+    ][0]
+    assert patched_container == {
+        "name": "feast-ui",
+        "resources": {
+            "requests": {"cpu": None, "memory": None},
+            "limits": {"cpu": None, "memory": None},
+        },
+    }
+
+
+def test_ambient_mode_libraries_not_imported_on_dispatch():
+    """Test the service mesh and ingress route libraries are not imported with the charm."""
+    # act:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import charm"],
+        capture_output=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join([".", "lib", "src"])},
+        text=True,
+    )
+
+    # assert:
+    imported_modules = {line.rsplit("|", 1)[-1].strip() for line in result.stderr.splitlines()}
+    assert "charm" in imported_modules
+    assert "charms.istio_beacon_k8s.v0.service_mesh" not in imported_modules
+    assert "charms.istio_ingress_k8s.v0.istio_ingress_route" not in imported_modules
+
+
+@pytest.mark.parametrize(
+    "endpoint", ["istio-ingress-route", "service-mesh", "require-cmr-mesh", "provide-cmr-mesh"]
+)
+def test_ambient_mode_libraries_loaded_with_ambient_relations(ctx, endpoint):
+    """Test the ambient mode libraries are only instantiated when their relations exist."""
+    # arrange:
+    relation = ops.testing.Relation(endpoint=endpoint)
+
+    # act:
+    with ctx(ctx.on.update_status(), State(leader=True)) as manager:
+        without_relations = manager.charm.ambient_mode_ingress
+        manager.run()
+    with ctx(ctx.on.update_status(), State(leader=True, relations=[relation])) as manager:
+        with_relations = manager.charm.ambient_mode_ingress
+        manager.run()
+
+    # assert:
+    assert without_relations is None
+    assert with_relations is not None